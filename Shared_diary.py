@@ -1,42 +1,69 @@
 import streamlit as st
-import json
-import os
-from datetime import datetime
+
+import diary_index
+import diary_store
 
 # --- CONFIGURATION ---
 # In a real deployed app, you would store these in st.secrets
 # For this example, we keep it simple.
 ACCESS_PASSWORD = "mysecretpassword"
-DATA_FILE = "diary_log.json"
+DATA_FILE = diary_store.DATA_FILE  # append-only JSON Lines (see diary_store.py)
 PAGE_TITLE = "The Inner Circle 🔒"
 PAGE_ICON = "🤫"
+MESSAGES_PER_PAGE = 50  # newest N are rendered; "Load older" adds another page
 
 # --- SETUP ---
 st.set_page_config(page_title=PAGE_TITLE, page_icon=PAGE_ICON)
 
 # --- FUNCTIONS ---
 
-def load_messages():
-    """Loads chat/diary entries from a local JSON file."""
-    if not os.path.exists(DATA_FILE):
-        return []
-    try:
-        with open(DATA_FILE, "r") as f:
-            return json.load(f)
-    except (json.JSONDecodeError, IOError):
-        return []
+@st.cache_resource
+def prepare_store():
+    """Converts an old diary_log.json once per process."""
+    return diary_store.migrate_legacy(DATA_FILE)
+
+@st.cache_resource
+def get_diary_tail():
+    """One incremental reader per process, shared by every session, kept fresh by a watcher thread."""
+    tail = diary_store.DiaryTail(DATA_FILE)
+    tail.refresh()
+    tail.watch()
+    return tail
+
+@st.cache_resource
+def get_diary_index():
+    """SQLite search index next to the log; brought up to date incrementally before each query."""
+    return diary_index.DiaryIndex(diary_index.INDEX_FILE, DATA_FILE)
+
+def live_fragment(run_every):
+    """st.fragment auto-refresh when this Streamlit has it; otherwise the pane updates on rerun."""
+    fragment = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None)
+    if fragment is None:
+        return lambda func: func
+    return fragment(run_every=run_every)
+
+def load_older():
+    st.session_state.show_count += MESSAGES_PER_PAGE
+
+def render_message(msg):
+    # Using Streamlit's chat_message UI component
+    # We assume 'Anonymous' or specific names for avatars
+    avatar = "👤"
+    if msg['author'] == st.session_state.author_name:
+        # Differentiate user's own messages visually if desired, 
+        # though standard chat apps put user on right.
+        # st.chat_message("user") puts it on the right with default styling.
+        with st.chat_message("user"):
+            st.write(msg['text'])
+            st.caption(f"{msg['timestamp']}")
+    else:
+        with st.chat_message("assistant", avatar=avatar): # "assistant" style is just left-aligned
+            st.write(f"**{msg['author']}**: {msg['text']}")
+            st.caption(f"{msg['timestamp']}")
 
 def save_message(author, text):
-    """Saves a new message to the local JSON file."""
-    messages = load_messages()
-    new_entry = {
-        "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-        "author": author,
-        "text": text
-    }
-    messages.append(new_entry)
-    with open(DATA_FILE, "w") as f:
-        json.dump(messages, f, indent=4)
+    """Appends a new message (one locked O_APPEND write, no rewrite of older entries)."""
+    return diary_store.append_message(author, text, DATA_FILE)
 
 def check_password():
     """Returns True if the user has entered the correct password."""
@@ -73,6 +100,8 @@ def check_password():
 
 # --- MAIN APP LOGIC ---
 
+prepare_store()
+
 if check_password():
     st.title(f"{PAGE_ICON} {PAGE_TITLE}")
     st.caption("A shared space for close friends.")
@@ -88,29 +117,54 @@ if check_password():
             st.session_state["password_correct"] = False
             st.rerun()
 
+        st.header("Search")
+        index = get_diary_index()
+        index.sync()
+        search_author = st.selectbox("Author", ["Everyone"] + index.authors())
+        search_text = st.text_input("Keyword", placeholder="e.g. 'beach trip'")
+        search_dates = st.date_input("Date range", value=(), help="Pick a start and an end day")
+
+    # --- SEARCH RESULTS ---
+    filters = {}
+    if search_author != "Everyone":
+        filters["author"] = search_author
+    if search_text.strip():
+        filters["keyword"] = search_text
+    if isinstance(search_dates, (list, tuple)) and search_dates:
+        filters["start"] = search_dates[0].isoformat()
+        filters["end"] = search_dates[-1].isoformat()
+    if filters:
+        results = index.search(**filters)
+        st.subheader(f"🔎 {len(results)} matching entr{'ies' if len(results) != 1 else 'y'}"
+                     + (" (newest shown)" if len(results) == diary_index.RESULT_LIMIT else ""))
+        for msg in results:
+            render_message(msg)
+        st.divider()
+
     # --- DISPLAY CHAT HISTORY ---
-    # Load messages fresh on every rerun so we see updates from others
-    messages = load_messages()
-
-    # Display loop
-    for msg in messages:
-        # Using Streamlit's chat_message UI component
-        # We assume 'Anonymous' or specific names for avatars
-        avatar = "👤"
-        if msg['author'] == st.session_state.author_name:
-            # Differentiate user's own messages visually if desired, 
-            # though standard chat apps put user on right.
-            # st.chat_message("user") puts it on the right with default styling.
-            with st.chat_message("user"):
-                st.write(msg['text'])
-                st.caption(f"{msg['timestamp']}")
-        else:
-            with st.chat_message("assistant", avatar=avatar): # "assistant" style is just left-aligned
-                st.write(f"**{msg['author']}**: {msg['text']}")
-                st.caption(f"{msg['timestamp']}")
+    # The shared watcher thread parses new lines as they land; this pane re-draws itself every
+    # second from memory, so other people's posts show up without a full-page rerun.
+    tail = get_diary_tail()
+
+    if "show_count" not in st.session_state:
+        st.session_state.show_count = MESSAGES_PER_PAGE
+
+    @live_fragment(run_every=1)
+    def message_pane():
+        messages = tail.latest(st.session_state.show_count)
+        if len(tail) > len(messages):
+            st.button(f"⬆️ Load older ({len(tail) - len(messages)} more)", on_click=load_older)
+
+        # Display loop
+        for msg in messages:
+            render_message(msg)
+
+    message_pane()
 
     # --- INPUT NEW MESSAGE ---
     # st.chat_input is fixed to the bottom of the screen
     if prompt := st.chat_input("Write something..."):
         save_message(st.session_state.author_name, prompt)
+        tail.refresh()  # don't wait for the watcher to show our own post
+        index.sync()
         st.rerun() # Rerun immediately to show the new message
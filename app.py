@@ -1,10 +1,10 @@
 import streamlit as st
-from PIL import Image
-import io
-import sqlite3
-import datetime
 import base64
-import pandas as pd
+import os
+import zipfile
+import stash_db
+import stash_images
+import stash_io
 
 # -----------------------
 # Config
@@ -14,6 +14,7 @@ st.set_page_config(page_title="1BOX — Dimensional Stash", layout="wide", initi
 DB_PATH = "1box.db"
 GRID_ROWS = 6
 GRID_COLS = 4  # 4 columns works well on mobile; user can change
+MAX_VISIBLE_ROWS = 12  # big boxes are shown a window of rows at a time
 
 # -----------------------
 # Styles (Diablo-like dark theme)
@@ -112,52 +113,12 @@ st.markdown(
 # -----------------------
 # Database helpers
 # -----------------------
-def init_db():
-    conn = sqlite3.connect(DB_PATH, check_same_thread=False)
-    cur = conn.cursor()
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS items (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            title TEXT,
-            remark TEXT,
-            location TEXT,
-            image BLOB,
-            grid_row INTEGER,
-            grid_col INTEGER,
-            created_at TEXT
-        )
-        """
-    )
-    conn.commit()
-    return conn
-
-conn = init_db()
-
-def save_item(title, remark, location, image_bytes, row=None, col=None):
-    now = datetime.datetime.now().isoformat()
-    cur = conn.cursor()
-    cur.execute(
-        "INSERT INTO items (title, remark, location, image, grid_row, grid_col, created_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
-        (title, remark, location, image_bytes, row, col, now),
-    )
-    conn.commit()
-    return cur.lastrowid
-
-def delete_item(item_id):
-    cur = conn.cursor()
-    cur.execute("DELETE FROM items WHERE id = ?", (item_id,))
-    conn.commit()
-
-def load_all_items():
-    cur = conn.cursor()
-    cur.execute("SELECT id, title, remark, location, image, grid_row, grid_col, created_at FROM items ORDER BY id")
-    return cur.fetchall()
-
-def update_item_cell(item_id, row, col):
-    cur = conn.cursor()
-    cur.execute("UPDATE items SET grid_row = ?, grid_col = ? WHERE id = ?", (row, col, item_id))
-    conn.commit()
+@st.cache_resource
+def get_stash_db():
+    # created once per process (schema + migrations); hands each session thread its own WAL connection
+    return stash_db.StashDB(DB_PATH, GRID_ROWS, GRID_COLS)
+
+conn = get_stash_db().connection()
 
 # -----------------------
 # Utilities
@@ -167,11 +128,23 @@ def img_bytes_from_upload(uploaded_file):
         return None
     return uploaded_file.read()
 
-def pil_from_bytes(b):
-    return Image.open(io.BytesIO(b))
-
-def bytes_to_base64(b):
-    return base64.b64encode(b).decode()
+# -----------------------
+# Sidebar: Stash boxes
+# -----------------------
+boxes = {b[1]: b for b in stash_db.list_boxes(conn)}
+box_names = {b[0]: b[1] for b in boxes.values()}
+box_id, box_name, box_rows, box_cols = boxes[st.sidebar.selectbox("📦 Stash box", list(boxes.keys()))]
+with st.sidebar.expander("➕ New stash box"):
+    with st.form("new_box_form", clear_on_submit=True):
+        nb_name = st.text_input("Box name", max_chars=40)
+        nb_rows = st.number_input("Rows", min_value=1, max_value=100000, value=GRID_ROWS)
+        nb_cols = st.number_input("Cols", min_value=1, max_value=100, value=GRID_COLS)
+        if st.form_submit_button("Create box"):
+            if not nb_name or nb_name in boxes:
+                st.error("Please pick a new, unique box name.")
+            else:
+                stash_db.create_box(conn, nb_name, int(nb_rows), int(nb_cols))
+                st.experimental_rerun()
 
 # -----------------------
 # Sidebar: Capture form
@@ -190,8 +163,8 @@ with st.sidebar.form("capture_form", clear_on_submit=False):
         select_slot = st.checkbox("Choose a specific slot", value=False)
     # if user chooses a specific slot we show selectors
     if select_slot:
-        pick_row = st.number_input("Slot row (1-index)", min_value=1, max_value=GRID_ROWS, value=1)
-        pick_col = st.number_input("Slot col (1-index)", min_value=1, max_value=GRID_COLS, value=1)
+        pick_row = st.number_input("Slot row (1-index)", min_value=1, max_value=box_rows, value=1)
+        pick_col = st.number_input("Slot col (1-index)", min_value=1, max_value=box_cols, value=1)
     else:
         pick_row = None
         pick_col = None
@@ -211,40 +184,24 @@ if submitted:
     elif image_bytes is None:
         st.sidebar.error("Please upload or capture a photo.")
     else:
-        # determine placement
-        items = load_all_items()
-        occupied = {(r, c): item for (item_id, t, rm, loc, im, r, c, ts) in items for (r, c, item) in [((r, c), item_id)] if r is not None}
-        # simpler method: build set of occupied coordinates
-        occ_coords = set()
-        for (item_id, t, rm, loc, im, r, c, ts) in items:
-            if r is not None and c is not None:
-                occ_coords.add((r, c))
-
-        assigned_row, assigned_col = None, None
-        if select_slot and pick_row and pick_col:
-            if (pick_row, pick_col) in occ_coords:
-                st.sidebar.error("That slot is already occupied. Either auto-place or choose another slot.")
-            else:
-                assigned_row, assigned_col = int(pick_row), int(pick_col)
-        elif auto_place:
-            # find first empty in row-major order
-            found = False
-            for rr in range(1, GRID_ROWS + 1):
-                for cc in range(1, GRID_COLS + 1):
-                    if (rr, cc) not in occ_coords:
-                        assigned_row, assigned_col = rr, cc
-                        found = True
-                        break
-                if found:
-                    break
-            if not found:
-                # grid full -> allow save but with no slot (will be in list)
-                assigned_row, assigned_col = None, None
-        else:
-            assigned_row, assigned_col = None, None
-
-        save_item(new_title, new_remark, new_location, image_bytes, assigned_row, assigned_col)
-        st.sidebar.success("Saved to 1BOX!" + (f" Placed at ({assigned_row},{assigned_col})." if assigned_row else ""))
+        # slot is reserved in the same transaction as the insert (next free slot when auto-placing;
+        # a full grid saves the item unplaced so it shows up in the list)
+        pick = (int(pick_row), int(pick_col)) if select_slot and pick_row and pick_col else (None, None)
+        try:
+            new_id, assigned_row, assigned_col = stash_db.save_item(
+                conn, new_title, new_remark, new_location, image_bytes, *pick,
+                auto_place=auto_place, box_id=box_id,
+            )
+            st.sidebar.success("Saved to 1BOX!" + (f" Placed at ({assigned_row},{assigned_col})." if assigned_row else ""))
+            # hash lookup against the band index: no stored photo is decoded
+            lookalikes = stash_db.find_similar_items(conn, new_id, stash_db.DUPLICATE_DISTANCE, limit=3)
+            if lookalikes:
+                names = ", ".join(f"“{m[1]}” (#{m[0]})" for _, m in lookalikes)
+                st.sidebar.warning(f"Looks like something already in the stash: {names}. Delete the new item if it's a duplicate.")
+        except stash_db.SlotOccupied:
+            st.sidebar.error("That slot is already occupied. Either auto-place or choose another slot.")
+        except stash_images.IMAGE_ERRORS:
+            st.sidebar.error("Could not read that photo. Please try a JPG or PNG.")
 
 # -----------------------
 # Top header
@@ -259,86 +216,84 @@ with col2:
 st.markdown("---")
 
 # -----------------------
-# Load items and build grid data structure
+# Load grid cells (placed items only, thumbnails only)
 # -----------------------
-items = load_all_items()  # each: id, title, remark, location, image, row, col, created_at
-
-grid = [[None for _ in range(GRID_COLS)] for _ in range(GRID_ROWS)]
-free_slots = []
-for r in range(GRID_ROWS):
-    for c in range(GRID_COLS):
-        free_slots.append((r+1, c+1))
-# place items into grid if they have coords
-floating_items = []  # items without assigned slot
-for item in items:
-    item_id, title, remark, location, image, row, col, created_at = item
-    if row is not None and col is not None:
-        if 1 <= row <= GRID_ROWS and 1 <= col <= GRID_COLS:
-            grid[row-1][col-1] = item
-            if (row, col) in free_slots:
-                free_slots.remove((row, col))
-    else:
-        floating_items.append(item)
+first_row = 1
+if box_rows > MAX_VISIBLE_ROWS:
+    first_row = int(st.sidebar.number_input("Show grid from row", min_value=1, max_value=box_rows - MAX_VISIBLE_ROWS + 1, value=1))
+visible_rows = min(box_rows, MAX_VISIBLE_ROWS)
+
+grid = [[None for _ in range(box_cols)] for _ in range(visible_rows)]
+for cell in stash_db.load_grid_cells(conn, box_id, first_row, first_row + visible_rows - 1, box_cols):
+    item_id, title, thumb, row, col = cell
+    grid[row-first_row][col-1] = cell
 
 # -----------------------
 # Sidebar: actions & export
 # -----------------------
 st.sidebar.markdown("---")
 st.sidebar.markdown("## 🔧 Actions")
-if st.sidebar.button("Export items as CSV (images base64)"):
-    # prepare dataframe
-    df_rows = []
-    for item in items:
-        item_id, title, remark, location, image, row, col, created_at = item
-        b64 = base64.b64encode(image).decode() if image else ""
-        df_rows.append({
-            "id": item_id,
-            "title": title,
-            "remark": remark,
-            "location": location,
-            "grid_row": row,
-            "grid_col": col,
-            "created_at": created_at,
-            "image_base64": b64
-        })
-    df = pd.DataFrame(df_rows)
-    csv = df.to_csv(index=False).encode()
-    b64 = base64.b64encode(csv).decode()
-    href = f'<a href="data:file/csv;base64,{b64}" download="1box_export.csv">Download CSV</a>'
-    st.sidebar.markdown(href, unsafe_allow_html=True)
+if st.sidebar.button("Export stash (ZIP: JSONL + photos)"):
+    # stream into a temp file on disk instead of building the archive in memory
+    old_export = st.session_state.pop("export_path", None)
+    if old_export and os.path.exists(old_export):
+        os.remove(old_export)
+    with stash_io.new_export_file() as tmp:  # in the app's export dir; stale exports are pruned
+        exported = stash_io.export_zip(conn, tmp)
+    st.session_state.export_path = tmp.name
+    st.session_state.export_count = exported
+if st.session_state.get("export_path") and os.path.exists(st.session_state.export_path):
+    with open(st.session_state.export_path, "rb") as export_file:
+        st.sidebar.download_button(
+            f"⬇️ Download ZIP ({st.session_state.export_count} items)",
+            data=export_file,
+            file_name="1box_export.zip",
+            mime="application/zip",
+        )
+
+import_file = st.sidebar.file_uploader("Import a 1BOX ZIP export", type=["zip"])
+if import_file is not None and st.sidebar.button("📥 Import items"):
+    try:
+        imported, unplaced, skipped = stash_io.import_zip(conn, import_file)
+        st.sidebar.success(f"Imported {imported} items" + (f" ({unplaced} unplaced)." if unplaced else "."))
+        if skipped:
+            st.sidebar.warning(f"Skipped {skipped} items with a missing or unreadable photo.")
+    except (zipfile.BadZipFile, KeyError, ValueError):
+        st.sidebar.error("That file is not a 1BOX export.")
 
 # -----------------------
 # Inventory Grid UI
 # -----------------------
-st.markdown("### 🎛️ Global Stash — Inventory Grid")
+st.markdown(f"### 🎛️ {st._sanitize_html(box_name)} — Inventory Grid")
 st.markdown('<div class="box">', unsafe_allow_html=True)
 
 # Build grid HTML
 grid_html = '<div class="inv-grid">'
 cell_index = 0
-for r in range(GRID_ROWS):
-    for c in range(GRID_COLS):
+for r in range(visible_rows):
+    for c in range(box_cols):
         cell = grid[r][c]
         if cell is None:
-            grid_html += f'''
+            grid_html += f"""
             <div class="inv-cell">
                 <div class="cell-empty">Empty</div>
             </div>
-            '''
+            """
         else:
-            item_id, title, remark, location, image, row_v, col_v, created_at = cell
-            b64 = base64.b64encode(image).decode()
+            item_id, title, thumb, row_v, col_v = cell
+            b64 = base64.b64encode(thumb).decode() if thumb else ""
+            mime = stash_images.image_mime(thumb or b"")
             safe_title = st._sanitize_html(title)
             # include a tiny caption overlay
-            grid_html += f'''
+            grid_html += f"""
             <div class="inv-cell">
-                <img src="data:image/png;base64,{b64}" />
+                <img src="data:{mime};base64,{b64}" />
                 <div class="cell-meta"><strong>{safe_title}</strong></div>
             </div>
-            '''
+            """
 grid_html += '</div>'
 
-st.components.v1.html(grid_html, height=GRID_ROWS * 110 + 40, scrolling=True)
+st.components.v1.html(grid_html, height=visible_rows * 110 + 40, scrolling=True)
 
 st.markdown("</div>", unsafe_allow_html=True)
 
@@ -347,77 +302,142 @@ st.markdown("</div>", unsafe_allow_html=True)
 # -----------------------
 st.markdown("---")
 st.markdown("### 📚 Items List & Details")
-for item in items[::-1]:  # newest first
-    item_id, title, remark, location, image, row, col, created_at = item
+
+def render_item_row(item, thumb):
+    item_id, title, remark, location, row, col, created_at, image_hash, item_box = item
+    slot_label = f"{box_names.get(item_box, '?')} ({row},{col})" if row else "Not placed"
     cols = st.columns([1, 3, 1])
     with cols[0]:
-        st.image(Image.open(io.BytesIO(image)), width=100)
+        if thumb:
+            st.image(thumb, width=100)
     with cols[1]:
         st.markdown(f"**{title}**  ")
         st.markdown(f"*{remark}*  ")
         st.markdown(f"**Location:** {location if location else '—'}  ")
-        st.markdown(f"**Slot:** {f'({row},{col})' if row else 'Not placed'}  ")
+        st.markdown(f"**Slot:** {slot_label}  ")
         st.markdown(f"**Added:** {created_at[:19].replace('T',' ')}")
     with cols[2]:
         if st.button(f"View → {item_id}", key=f"view_{item_id}"):
             st.session_state[f"open_{item_id}"] = True
+        if st.button("Find similar", key=f"similar_{item_id}"):
+            st.session_state[f"similar_{item_id}_open"] = True
         if st.button(f"Delete ✖ {item_id}", key=f"del_{item_id}"):
-            delete_item(item_id)
+            stash_db.delete_item(conn, item_id)
             st.experimental_rerun()
         # move controls
         with st.expander("Move / Place slot"):
-            newr = st.number_input("Row (1-index)", min_value=1, max_value=GRID_ROWS, value=row if row else 1, key=f"move_r_{item_id}")
-            newc = st.number_input("Col (1-index)", min_value=1, max_value=GRID_COLS, value=col if col else 1, key=f"move_c_{item_id}")
+            st.caption(f"Moves into: {box_name}")
+            newr = st.number_input("Row (1-index)", min_value=1, max_value=box_rows, value=min(row or 1, box_rows), key=f"move_r_{item_id}")
+            newc = st.number_input("Col (1-index)", min_value=1, max_value=box_cols, value=min(col or 1, box_cols), key=f"move_c_{item_id}")
             if st.button("Place here", key=f"place_{item_id}"):
-                # check occupancy by other items
-                occupied = False
-                for it in items:
-                    if it[0] != item_id and it[5] == newr and it[6] == newc:
-                        occupied = True
-                        break
-                if occupied:
-                    st.warning("That slot is occupied. Choose another.")
-                else:
-                    update_item_cell(item_id, newr, newc)
+                # the UNIQUE (box, row, col) index + slot allocator decide occupancy atomically
+                try:
+                    stash_db.place_item(conn, item_id, int(newr), int(newc), box_id=box_id)
                     st.experimental_rerun()
+                except stash_db.SlotOccupied:
+                    st.warning("That slot is occupied. Choose another.")
 
-    # show details in collapse if requested
+    # show details in collapse if requested (the only place the original is loaded)
     if st.session_state.get(f"open_{item_id}", False):
         with st.expander(f"Details — {title}", expanded=True):
-            st.image(Image.open(io.BytesIO(image)), width=240)
+            original = stash_images.load_original(image_hash)
+            if original:
+                st.image(original, width=240)
             st.write("**Remark:**", remark)
             st.write("**Location:**", location)
-            st.write("**Slot:**", f"({row},{col})" if row else "Not placed")
+            st.write("**Slot:**", slot_label)
             if st.button("Close", key=f"close_{item_id}"):
                 st.session_state[f"open_{item_id}"] = False
 
-# Floating unplaced items notice
+    if st.session_state.get(f"similar_{item_id}_open", False):
+        with st.expander(f"Similar to — {title}", expanded=True):
+            similar = stash_db.find_similar_items(conn, item_id)
+            if not similar:
+                st.caption("No similar photos found.")
+            similar_thumbs = stash_db.load_thumbs(conn, [m[0] for _, m in similar])
+            for distance, match in similar:
+                m_cols = st.columns([1, 4])
+                with m_cols[0]:
+                    if similar_thumbs.get(match[0]):
+                        st.image(similar_thumbs[match[0]], width=70)
+                with m_cols[1]:
+                    m_slot = f"{box_names.get(match[8], '?')} ({match[4]},{match[5]})" if match[4] else "Not placed"
+                    label = "likely duplicate" if distance <= stash_db.DUPLICATE_DISTANCE else "similar"
+                    st.markdown(f"**{match[1]}** (#{match[0]}) — {m_slot} · {label}, {distance}/64 bits apart")
+            if st.button("Close", key=f"close_similar_{item_id}"):
+                st.session_state[f"similar_{item_id}_open"] = False
+
+search_q = st.text_input("🔎 Search items", placeholder="title, remark or location — prefixes work, e.g. 'scr' or 'kitch draw'")
+
+if search_q.strip():
+    # ranked FTS matches; only these rows' thumbnails are fetched
+    results = stash_db.search_items(conn, search_q)
+    result_thumbs = stash_db.load_thumbs(conn, [it[0] for it in results])
+    st.caption(f"{len(results)} match{'es' if len(results) != 1 else ''}" + (" (top results)" if len(results) == stash_db.PAGE_SIZE else ""))
+    for item in results:
+        render_item_row(item, result_thumbs.get(item[0]))
+else:
+    # keyset pagination: remember the last id of every page we stepped through
+    if "page_cursors" not in st.session_state:
+        st.session_state.page_cursors = [None]
+    page_items = stash_db.load_items_page(conn, before_id=st.session_state.page_cursors[-1])  # newest first
+    page_thumbs = stash_db.load_thumbs(conn, [it[0] for it in page_items])
+
+    for item in page_items:
+        render_item_row(item, page_thumbs.get(item[0]))
+
+    nav_prev, nav_info, nav_next = st.columns([1, 2, 1])
+    with nav_prev:
+        if len(st.session_state.page_cursors) > 1 and st.button("← Newer"):
+            st.session_state.page_cursors.pop()
+            st.experimental_rerun()
+    with nav_info:
+        st.markdown(f'<div class="muted">Page {len(st.session_state.page_cursors)} · {stash_db.count_items(conn)} items</div>', unsafe_allow_html=True)
+    with nav_next:
+        if len(page_items) == stash_db.PAGE_SIZE and st.button("Older →"):
+            st.session_state.page_cursors.append(page_items[-1][0])
+            st.experimental_rerun()
+
+# Floating unplaced items notice (paged like the item list: a stack of "after id" cursors)
+if "floating_cursors" not in st.session_state:
+    st.session_state.floating_cursors = [None]
+floating_items = stash_db.load_floating_items(conn, after_id=st.session_state.floating_cursors[-1])
+if not floating_items and len(st.session_state.floating_cursors) > 1:
+    # the last items on this page were placed: go back to the first page
+    st.session_state.floating_cursors = [None]
+    floating_items = stash_db.load_floating_items(conn)
 if floating_items:
+    floating_thumbs = stash_db.load_thumbs(conn, [it[0] for it in floating_items])
+    floating_total = stash_db.count_floating_items(conn)
     st.markdown("---")
-    st.markdown("### 🧭 Unplaced items (not assigned to any grid slot)")
+    st.markdown(f"### 🧭 Unplaced items (not assigned to any grid slot) — {floating_total}")
     for item in floating_items:
-        item_id, title, remark, location, image, row, col, created_at = item
+        item_id, title, remark, location, row, col, created_at, image_hash, item_box = item
         cols = st.columns([1, 3, 1])
         with cols[0]:
-            st.image(Image.open(io.BytesIO(image)), width=90)
+            if floating_thumbs.get(item_id):
+                st.image(floating_thumbs[item_id], width=90)
         with cols[1]:
             st.markdown(f"**{title}** — {remark}  ")
             st.markdown(f"Location: {location}")
         with cols[2]:
             if st.button(f"Place item {item_id}", key=f"placefloat_{item_id}"):
-                # find first free
-                curr_items = load_all_items()
-                occ = {(it[5], it[6]) for it in curr_items if it[5] is not None}
-                placed = False
-                for rr in range(1, GRID_ROWS+1):
-                    for cc in range(1, GRID_COLS+1):
-                        if (rr, cc) not in occ:
-                            update_item_cell(item_id, rr, cc)
-                            placed = True
-                            break
-                    if placed:
-                        break
+                # next free slot of the selected box (stays unplaced if the box is full)
+                stash_db.place_item(conn, item_id, box_id=box_id)
                 st.experimental_rerun()
 
+    float_prev, float_info, float_next = st.columns([1, 2, 1])
+    with float_prev:
+        if len(st.session_state.floating_cursors) > 1 and st.button("← Previous", key="floating_prev"):
+            st.session_state.floating_cursors.pop()
+            st.experimental_rerun()
+    with float_info:
+        first = (len(st.session_state.floating_cursors) - 1) * stash_db.PAGE_SIZE
+        st.markdown(f'<div class="muted">Showing {first + 1}–{first + len(floating_items)} of {floating_total} unplaced</div>', unsafe_allow_html=True)
+    with float_next:
+        if len(floating_items) == stash_db.PAGE_SIZE and first + len(floating_items) < floating_total and st.button("More →", key="floating_next"):
+            st.session_state.floating_cursors.append(floating_items[-1][0])
+            st.experimental_rerun()
+
 st.markdown("---")
 st.markdown('<div class="muted">Tip: On mobile, use the camera capture to quickly snap an item, write a short remark, and check "Auto-place".</div>', unsafe_allow_html=True)
@@ -0,0 +1,65 @@
+import argparse
+import datetime
+import gc
+import time
+import tracemalloc
+
+from smart_engine import Analyst, FundManager
+
+# --- VOTER MEMORY BENCHMARK ---
+# Compares the old dict-backed voter classes with the slotted ones in smart_engine.
+#   python bench_voters.py --count 200000
+
+class DictVoter:
+    def __init__(self, name, credibility_score):
+        self.name = name
+        self.credibility_score = credibility_score
+
+class DictAnalyst(DictVoter):
+    def __init__(self, name, firm, credibility_score, price_target, rating_date):
+        super().__init__(name, credibility_score)
+        self.firm = firm
+        self.price_target = price_target
+        self.rating_date = rating_date
+
+class DictFundManager(DictVoter):
+    def __init__(self, name, fund_name, credibility_score, action, conviction_level):
+        super().__init__(name, credibility_score)
+        self.fund_name = fund_name
+        self.action = action
+        self.conviction_level = conviction_level
+
+def build(analyst_cls, fund_cls, count):
+    # Argument objects are shared so only the voter records themselves are measured
+    now = datetime.datetime.now()
+    voters = []
+    for i in range(count // 2):
+        voters.append(analyst_cls("Goldman Sachs", "Recent Rating", 0.8, 123.45, now))
+        voters.append(fund_cls("Vanguard Group Inc", "Vanguard Group", 0.85, "BUY", 0.8))
+    return voters
+
+def measure(label, analyst_cls, fund_cls, count):
+    gc.collect()
+    tracemalloc.start()
+    voters = build(analyst_cls, fund_cls, count)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del voters
+
+    gc.collect()
+    start = time.perf_counter()
+    voters = build(analyst_cls, fund_cls, count)
+    elapsed = time.perf_counter() - start
+    del voters
+
+    print(f"{label:<10} | {size / count:7.1f} bytes/voter | {count / elapsed / 1e6:6.2f} M voters/s")
+    return size / count
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bytes per voter and construction throughput, before vs after __slots__.")
+    parser.add_argument("--count", type=int, default=200_000)
+    args = parser.parse_args()
+
+    before = measure("dict", DictAnalyst, DictFundManager, args.count)
+    after = measure("slots", Analyst, FundManager, args.count)
+    print(f"Memory saved: {(1 - after / before) * 100:.0f}%")
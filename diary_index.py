@@ -0,0 +1,154 @@
+import os
+import re
+import sqlite3
+import threading
+
+import diary_store
+
+# --- DIARY SEARCH INDEX ---
+# A SQLite side index over the JSONL log: entries(ts, author, text) with B-tree indexes on the
+# timestamp and (author, timestamp), plus an FTS5 table over author/text. sync() only reads the
+# bytes appended since the stored offset, so keeping it current costs O(new posts).
+INDEX_FILE = "diary_index.db"
+RESULT_LIMIT = 200
+BUSY_TIMEOUT_MS = 5000
+
+def connect(path=INDEX_FILE):
+    conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT_MS / 1000, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+def init_schema(conn):
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries (id INTEGER PRIMARY KEY, ts TEXT NOT NULL, author TEXT, text TEXT)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_ts ON entries (ts)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_author_ts ON entries (author, ts)")
+        conn.execute("CREATE TABLE IF NOT EXISTS sync_state (key TEXT PRIMARY KEY, value INTEGER)")
+        if not conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'entries_fts'").fetchone():
+            try:
+                conn.execute(
+                    "CREATE VIRTUAL TABLE entries_fts USING fts5(author, text, content='entries', content_rowid='id', "
+                    "tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+                )
+                conn.execute(
+                    "CREATE TRIGGER IF NOT EXISTS entries_fts_ai AFTER INSERT ON entries BEGIN "
+                    "INSERT INTO entries_fts (rowid, author, text) VALUES (new.id, new.author, new.text); END"
+                )
+                conn.execute(
+                    "CREATE TRIGGER IF NOT EXISTS entries_fts_ad AFTER DELETE ON entries BEGIN "
+                    "INSERT INTO entries_fts (entries_fts, rowid, author, text) VALUES ('delete', old.id, old.author, old.text); END"
+                )
+            except sqlite3.OperationalError:
+                pass  # no FTS5 in this SQLite build: keyword search falls back to LIKE
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
+
+def has_fts(conn):
+    return conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'entries_fts'").fetchone() is not None
+
+def _state(conn, key):
+    found = conn.execute("SELECT value FROM sync_state WHERE key = ?", (key,)).fetchone()
+    return found[0] if found else None
+
+def sync(conn, log_path=diary_store.DATA_FILE):
+    """Indexes entries appended to the log since the last sync. Returns how many were added.
+
+    If the log was replaced (compaction) or shrank, the index is rebuilt from scratch.
+    """
+    try:
+        st = os.stat(log_path)
+    except FileNotFoundError:
+        return 0
+    if _state(conn, "inode") == st.st_ino and _state(conn, "size") == st.st_size:
+        return 0  # unchanged since last sync: no read, no write lock
+
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        offset = _state(conn, "offset") or 0
+        if _state(conn, "inode") != st.st_ino or st.st_size < offset:
+            conn.execute("DELETE FROM entries")
+            offset = 0
+        with open(log_path, "rb") as f:
+            f.seek(offset)
+            data = f.read()
+        messages, _, consumed = diary_store.parse_lines(data)
+        conn.executemany(
+            "INSERT INTO entries (ts, author, text) VALUES (?, ?, ?)",
+            [(m.get("timestamp", ""), m.get("author"), m.get("text")) for m in messages],
+        )
+        conn.executemany(
+            "INSERT OR REPLACE INTO sync_state (key, value) VALUES (?, ?)",
+            [("offset", offset + consumed), ("inode", st.st_ino), ("size", offset + consumed)],
+        )
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
+    return len(messages)
+
+def list_authors(conn):
+    return [r[0] for r in conn.execute("SELECT DISTINCT author FROM entries WHERE author IS NOT NULL ORDER BY author")]
+
+def search(conn, keyword=None, author=None, start=None, end=None, limit=RESULT_LIMIT):
+    """Entries matching all given filters, newest first, as diary message dicts.
+
+    `start`/`end` are "YYYY-MM-DD[ HH:MM:SS]" strings (inclusive); keyword words match as prefixes.
+    """
+    where, params = [], []
+    if author:
+        where.append("e.author = ?")
+        params.append(author)
+    if start:
+        where.append("e.ts >= ?")
+        params.append(start)
+    if end:
+        where.append("e.ts <= ?")
+        params.append(end if len(end) > 10 else end + " 23:59:59")
+
+    terms = re.findall(r"\w+", (keyword or "").lower())[:8]
+    source = "entries e"
+    if terms and has_fts(conn):
+        source = "entries_fts JOIN entries e ON e.id = entries_fts.rowid"
+        where.append("entries_fts MATCH ?")
+        params.append(" ".join(f'"{t}"*' for t in terms))
+    else:
+        for t in terms:
+            where.append("(e.text LIKE ? OR e.author LIKE ?)")
+            params += [f"%{t}%", f"%{t}%"]
+
+    sql = f"SELECT e.ts, e.author, e.text FROM {source}"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY e.ts DESC, e.id DESC LIMIT ?"
+    rows = conn.execute(sql, (*params, limit)).fetchall()
+    return [{"timestamp": ts, "author": a, "text": text} for ts, a, text in rows]
+
+class DiaryIndex:
+    """Process-wide handle with one connection per thread (Streamlit sessions run on threads)."""
+    def __init__(self, path=INDEX_FILE, log_path=diary_store.DATA_FILE):
+        self.path = path
+        self.log_path = log_path
+        self._local = threading.local()
+        init_schema(self.connection())
+
+    def connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = connect(self.path)
+        return conn
+
+    def sync(self):
+        return sync(self.connection(), self.log_path)
+
+    def authors(self):
+        return list_authors(self.connection())
+
+    def search(self, **filters):
+        self.sync()
+        return search(self.connection(), **filters)
@@ -0,0 +1,256 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import fcntl
+except ImportError:  # Windows: no flock, fall back to plain O_APPEND writes
+    fcntl = None
+
+# --- DIARY STORAGE ---
+# One JSON object per line, only ever appended to. A post is a single O_APPEND write of one
+# line under an exclusive flock, so concurrent posters can't interleave or drop each other's
+# entries and posting cost doesn't grow with the history.
+DATA_FILE = "diary_log.jsonl"
+LEGACY_FILE = "diary_log.json"  # old format: one JSON array rewritten on every post
+WATCH_INTERVAL = 0.5  # seconds between stat() calls of the background watcher
+COMPACT_INTERVAL = 24 * 3600  # periodic compaction: at most once a day (across processes)
+COMPACT_CHECK = 60  # seconds between the watcher's checks of whether a compaction is due
+
+def lock_path(path):
+    return path + ".lock"
+
+@contextmanager
+def locked(path=DATA_FILE):
+    """Exclusive lock shared by writers and compaction (a separate file, so it survives os.replace)."""
+    fd = os.open(lock_path(path), os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        yield
+    finally:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        os.close(fd)
+
+def encode_entry(entry):
+    return (json.dumps(entry, ensure_ascii=False) + "\n").encode("utf-8")
+
+def _ends_with_newline(fd):
+    """True for an empty file or one whose last byte is a newline (O_APPEND writes ignore the seek)."""
+    end = os.lseek(fd, 0, os.SEEK_END)
+    if end == 0:
+        return True
+    os.lseek(fd, end - 1, os.SEEK_SET)
+    return os.read(fd, 1) == b"\n"
+
+def append_message(author, text, path=DATA_FILE):
+    """Appends one entry and returns it. O(1) regardless of history size."""
+    entry = {
+        "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "author": author,
+        "text": text,
+    }
+    line = encode_entry(entry)
+    with locked(path):
+        fd = os.open(path, os.O_RDWR | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            # a crash mid-append leaves a line without its newline; start ours on a fresh line
+            # so it isn't glued onto the fragment (the fragment alone is dropped as corrupt)
+            if not _ends_with_newline(fd):
+                line = b"\n" + line
+            written = os.write(fd, line)
+            while written < len(line):  # short writes are rare, but finish the line under the lock
+                written += os.write(fd, line[written:])
+        finally:
+            os.close(fd)
+    return entry
+
+def parse_lines(data):
+    """Parses complete lines from a bytes chunk. Returns (messages, bad_lines, bytes_consumed).
+
+    A trailing fragment without a newline is left unconsumed (a writer may be mid-append).
+    """
+    messages, bad = [], 0
+    end = data.rfind(b"\n") + 1
+    for raw in data[:end].splitlines():
+        if not raw.strip():
+            continue
+        try:
+            msg = json.loads(raw)
+        except ValueError:
+            bad += 1
+            continue
+        if isinstance(msg, dict) and "text" in msg:
+            messages.append(msg)
+        else:
+            bad += 1
+    return messages, bad, end
+
+def read_messages(path=DATA_FILE):
+    """Returns (messages, bad_lines) for the whole log."""
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except FileNotFoundError:
+        return [], 0
+    messages, bad, _ = parse_lines(data)
+    return messages, bad
+
+def load_messages(path=DATA_FILE):
+    """All readable entries; corrupt lines are skipped and trigger a compaction."""
+    messages, bad = read_messages(path)
+    if bad:
+        compact(path)
+    return messages
+
+def compact(path=DATA_FILE):
+    """Rewrites the log without corrupt or blank lines or a torn tail left by a crash. Holds the
+    writer lock, so no post is lost; a log that is already clean is not rewritten.
+
+    Returns the number of corrupt lines dropped.
+    """
+    with locked(path):
+        messages, bad = read_messages(path)
+        try:
+            size = os.path.getsize(path)
+        except FileNotFoundError:
+            return 0
+        if not bad and size == sum(len(encode_entry(m)) for m in messages):
+            return 0
+        _write_all(messages, path)
+    return bad
+
+def compact_stamp(path):
+    return path + ".compacted"
+
+def maybe_compact(path=DATA_FILE, interval=COMPACT_INTERVAL):
+    """Periodic compaction: runs compact() if the last one (by any process) is older than `interval`.
+
+    Corrupt lines are also compacted away as soon as a reader meets them; this pass catches
+    what no reader re-parses (blank lines, a torn final line). Returns None when not due.
+    """
+    stamp = compact_stamp(path)
+    try:
+        if time.time() - os.path.getmtime(stamp) < interval:
+            return None
+    except FileNotFoundError:
+        pass
+    dropped = compact(path)
+    with open(stamp, "a"):
+        os.utime(stamp)
+    return dropped
+
+def _write_all(messages, path):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        for msg in messages:
+            f.write(encode_entry(msg))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+def migrate_legacy(path=DATA_FILE, legacy_path=LEGACY_FILE):
+    """One-time conversion of the old JSON-array file; the original is kept as <name>.bak."""
+    if not os.path.exists(legacy_path):
+        return 0
+    with locked(path):
+        if not os.path.exists(legacy_path) or os.path.exists(path):
+            return 0
+        try:
+            with open(legacy_path, "r", encoding="utf-8") as f:
+                messages = json.load(f)
+        except (ValueError, OSError):
+            messages = []
+        _write_all([m for m in messages if isinstance(m, dict)], path)
+        os.replace(legacy_path, legacy_path + ".bak")
+    return len(messages)
+
+# --- INCREMENTAL READER ---
+class DiaryTail:
+    """Per-process cache of the log that only parses bytes appended since the last refresh.
+
+    Remembers (inode, offset, size, mtime); a replaced file (compaction, migration) or a shrunk
+    one is re-read from the start. Safe to share between Streamlit sessions (threads).
+    """
+    def __init__(self, path=DATA_FILE):
+        self.path = path
+        self.messages = []
+        self._inode = None
+        self._offset = 0
+        self._size = 0
+        self._mtime = None
+        self._lock = threading.Lock()
+        self._watcher = None
+        self._stop = threading.Event()
+
+    def refresh(self):
+        """Reads newly appended lines. Returns how many new messages were added."""
+        with self._lock:
+            try:
+                st = os.stat(self.path)
+            except FileNotFoundError:
+                if self.messages or self._inode is not None:
+                    self._reset(None)
+                return 0
+            if st.st_ino != self._inode or st.st_size < self._offset:
+                self._reset(st.st_ino)
+            elif st.st_size == self._size and st.st_mtime_ns == self._mtime:
+                return 0  # nothing written since last time: no read at all
+
+            with open(self.path, "rb") as f:
+                f.seek(self._offset)
+                data = f.read()
+            new, bad, consumed = parse_lines(data)
+            self._offset += consumed
+            self._size, self._mtime = st.st_size, st.st_mtime_ns
+            if new:
+                self.messages.extend(new)
+        if bad:
+            compact(self.path)  # new inode -> the next refresh re-reads the clean file
+        return len(new)
+
+    def watch(self, interval=WATCH_INTERVAL):
+        """Starts (once) a daemon thread that refreshes whenever the file changes.
+
+        A single stat() per interval for the whole process; sessions only read from memory. The
+        same thread runs the periodic compaction (maybe_compact).
+        """
+        with self._lock:
+            if self._watcher is not None and self._watcher.is_alive():
+                return
+            self._stop.clear()
+            self._watcher = threading.Thread(target=self._watch_loop, args=(interval,), name="diary-watcher", daemon=True)
+            self._watcher.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _watch_loop(self, interval):
+        next_compact_check = 0.0
+        while not self._stop.wait(interval):
+            try:
+                self.refresh()
+                if time.monotonic() >= next_compact_check:
+                    next_compact_check = time.monotonic() + COMPACT_CHECK
+                    maybe_compact(self.path)
+            except OSError:
+                pass  # transient (e.g. file replaced mid-read); next tick retries
+
+    def _reset(self, inode):
+        self.messages = []
+        self._inode = inode
+        self._offset = self._size = 0
+        self._mtime = None
+
+    def latest(self, count, skip=0):
+        """The `count` messages before the newest `skip` ones, oldest first."""
+        with self._lock:
+            end = len(self.messages) - skip
+            return self.messages[max(0, end - count):max(0, end)]
+
+    def __len__(self):
+        return len(self.messages)
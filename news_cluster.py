@@ -0,0 +1,139 @@
+import re
+import threading
+import zlib
+
+import numpy as np
+
+# --- STORY CLUSTERING ---
+# Groups the same story reported by different outlets. Each headline + summary becomes a set of
+# content-word shingles -> a 64-value MinHash signature -> 32 LSH bands of 2 rows. Articles sharing a
+# band bucket are candidate duplicates; the ones whose signatures agree on enough positions are
+# merged with union-find. Adding an article touches only its own 32 buckets, so clustering is
+# linear in the number of new articles and never compares all pairs.
+NUM_PERM = 64
+BANDS = 32
+ROWS = NUM_PERM // BANDS
+# Outlets word the same story differently, so single content words (not phrases) are compared
+SHINGLE_SIZE = 1
+SIMILARITY = 0.35  # estimated Jaccard needed to merge two candidates
+
+_PRIME = np.uint64(4294967291)  # largest prime below 2**32
+_rng = np.random.default_rng(20251123)  # fixed seed: signatures are stable across restarts
+_A = _rng.integers(1, 2 ** 31, size=NUM_PERM, dtype=np.uint64)
+_B = _rng.integers(0, 2 ** 31, size=NUM_PERM, dtype=np.uint64)
+
+_WORDS = re.compile(r"\w+")
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the this to was were "
+    "will with after over into says said new more than amid about".split()
+)
+
+def shingles(text, size=SHINGLE_SIZE):
+    """crc32 of each run of `size` consecutive content words (lower-cased, stopwords dropped)."""
+    words = [w for w in _WORDS.findall(text.lower()) if w not in STOPWORDS]
+    if len(words) < size:
+        grams = [" ".join(words)] if words else []
+    else:
+        grams = [" ".join(words[i:i + size]) for i in range(len(words) - size + 1)]
+    return np.fromiter({zlib.crc32(g.encode("utf-8")) for g in grams}, dtype=np.uint64)
+
+def minhash(shingle_hashes):
+    """NUM_PERM-long signature: min over shingles of (a*x + b) mod p for each permutation."""
+    if shingle_hashes.size == 0:
+        return np.full(NUM_PERM, np.iinfo(np.uint64).max, dtype=np.uint64)
+    # (NUM_PERM, 1) x (1, n) -> (NUM_PERM, n); a, b < 2**31 and x < 2**32 so nothing overflows
+    values = (_A[:, None] * shingle_hashes[None, :] + _B[:, None]) % _PRIME
+    return values.min(axis=1)
+
+def minhash_many(shingle_sets):
+    """Signatures for many articles in one vectorized pass -> (len(shingle_sets), NUM_PERM)."""
+    out = np.full((len(shingle_sets), NUM_PERM), np.iinfo(np.uint64).max, dtype=np.uint64)
+    filled = [i for i, s in enumerate(shingle_sets) if s.size]
+    if not filled:
+        return out
+    flat = np.concatenate([shingle_sets[i] for i in filled])
+    starts = np.cumsum([0] + [shingle_sets[i].size for i in filled[:-1]])
+    values = (_A[:, None] * flat[None, :] + _B[:, None]) % _PRIME
+    out[filled] = np.minimum.reduceat(values, starts, axis=1).T
+    return out
+
+def article_text(article):
+    return f"{article.get('title', '')} {article.get('summary', '')}"
+
+class StoryClusterer:
+    """Incremental MinHash-LSH clustering of articles (dicts with "id", "title", "summary", "source")."""
+    def __init__(self, similarity=SIMILARITY):
+        self.similarity = similarity
+        self._signatures = {}  # article id -> signature
+        self._parent = {}      # union-find
+        self._buckets = {}     # (band, band bytes) -> one article id already in that bucket
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._signatures)
+
+    def _find(self, item):
+        parent = self._parent
+        root = item
+        while parent[root] != root:
+            root = parent[root]
+        while parent[item] != root:  # path compression
+            parent[item], item = root, parent[item]
+        return root
+
+    def _union(self, a, b):
+        ra, rb = self._find(a), self._find(b)
+        if ra != rb:
+            self._parent[max(ra, rb)] = min(ra, rb)
+
+    def _insert(self, article_id, signature):
+        self._signatures[article_id] = signature
+        self._parent[article_id] = article_id
+        raw = signature.tobytes()
+        width = ROWS * signature.itemsize
+        needed = self.similarity * NUM_PERM
+        checked = set()
+        for band in range(BANDS):
+            other = self._buckets.setdefault((band, raw[band * width:(band + 1) * width]), article_id)
+            if other == article_id or other in checked:
+                continue
+            checked.add(other)
+            if self._find(other) == self._find(article_id):
+                continue
+            if np.count_nonzero(self._signatures[other] == signature) >= needed:
+                self._union(article_id, other)
+
+    def add(self, articles):
+        """Clusters articles not seen before. Returns how many were new."""
+        with self._lock:
+            new = {a["id"]: a for a in articles if a["id"] not in self._signatures}
+            if not new:
+                return 0
+            signatures = minhash_many([shingles(article_text(a)) for a in new.values()])
+            for article_id, signature in zip(new, signatures):
+                self._insert(article_id, signature)
+        return len(new)
+
+    def retain(self, keep_ids):
+        """Forgets articles that left the store (rebuilds buckets from the kept signatures)."""
+        keep_ids = set(keep_ids)
+        with self._lock:
+            if len(self._signatures) <= 2 * len(keep_ids):
+                return
+            kept = [(i, s) for i, s in self._signatures.items() if i in keep_ids]
+            self._signatures, self._parent, self._buckets = {}, {}, {}
+            for article_id, signature in kept:
+                self._insert(article_id, signature)
+
+    def clusters(self, articles):
+        """Groups the given articles (in their order) into stories. Returns a list of lists.
+
+        The first article of each group keeps its position, so a newest-first input gives
+        newest-first stories with the freshest report leading each group.
+        """
+        self.add(articles)
+        groups = {}
+        with self._lock:
+            for article in articles:
+                groups.setdefault(self._find(article["id"]), []).append(article)
+        return list(groups.values())
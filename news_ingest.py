@@ -0,0 +1,202 @@
+import asyncio
+import hashlib
+import html
+import re
+import time
+import urllib.error
+import urllib.request
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from xml.etree.ElementTree import ParseError, XMLPullParser
+
+# --- FEED INGESTION ---
+# Every feed is fetched at the same time (asyncio + worker threads), so a refresh takes as long
+# as the slowest feed. Conditional GET (ETag / Last-Modified) turns unchanged feeds into a bare
+# 304, and the XML is parsed incrementally as chunks arrive instead of buffering the document.
+FEEDS = {
+    "NY Times (USA)": {"region": "Americas", "url": "https://rss.nytimes.com/services/xml/rss/nyt/World.xml"},
+    "ABC News (USA)": {"region": "Americas", "url": "https://abcnews.go.com/abcnews/internationalheadlines"},
+    "TIME (USA)": {"region": "Americas", "url": "https://time.com/feed/"},
+    "Straits Times (SG)": {"region": "Asia", "url": "https://www.straitstimes.com/news/world/rss.xml"},
+    "NHK (Japan)": {"region": "Asia", "url": "https://www3.nhk.or.jp/rss/news/cat6.xml"},
+    "PTS (Taiwan)": {"region": "Asia", "url": "https://news.pts.org.tw/xml/newsfeed.xml"},
+    "The Guardian (UK)": {"region": "Europe", "url": "https://www.theguardian.com/world/rss"},
+    "DW News (DE)": {"region": "Europe", "url": "https://rss.dw.com/rdf/rss-en-world"},
+}
+
+TIMEOUT = 10  # seconds per feed
+CHUNK_SIZE = 64 * 1024
+MAX_ITEMS_PER_FEED = 100
+USER_AGENT = "WorldView/1.0 (+RSS reader)"
+
+# Validators from the last successful response, per feed: {name: {"etag": ..., "last_modified": ...}}
+FEED_STATE = {}
+
+def _local(tag):
+    return tag.rsplit("}", 1)[-1].lower()
+
+_TAGS = re.compile(r"<[^>]+>")
+_SPACES = re.compile(r"\s+")
+_SPACE_BEFORE_PUNCT = re.compile(r"\s+([.,;:!?])")
+
+def clean_text(value):
+    """Feed summaries often carry HTML: strip tags, unescape entities, collapse whitespace."""
+    if not value:
+        return ""
+    text = _SPACES.sub(" ", html.unescape(_TAGS.sub(" ", value))).strip()
+    return _SPACE_BEFORE_PUNCT.sub(r"\1", text)
+
+def parse_date(value):
+    """RFC 822 (RSS) or ISO 8601 (Atom / dc:date) -> aware UTC datetime, or None."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        dt = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        try:
+            dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc)
+
+def article_id(link, title=""):
+    return hashlib.sha1((link or title).encode("utf-8")).hexdigest()
+
+def _item_to_article(elem, source, region):
+    fields = {}
+    link = None
+    for child in elem:
+        name = _local(child.tag)
+        if name == "link":
+            # Atom: <link rel="alternate" href=...>; RSS: <link>url</link>
+            href = child.get("href")
+            if href and child.get("rel", "alternate") == "alternate":
+                link = link or href
+            elif child.text and child.text.strip():
+                link = link or child.text.strip()
+        elif name not in fields and child.text:
+            fields[name] = child.text
+    title = clean_text(fields.get("title"))
+    if not title:
+        return None
+    link = link or fields.get("guid") or fields.get("id") or ""
+    summary = clean_text(fields.get("description") or fields.get("summary") or fields.get("encoded") or fields.get("content"))
+    published = parse_date(fields.get("pubdate") or fields.get("published") or fields.get("updated") or fields.get("date"))
+    return {
+        "id": article_id(link, title),
+        "source": source,
+        "region": region,
+        "title": title,
+        "link": link,
+        "summary": summary,
+        "category": clean_text(fields.get("category")),
+        "published": (published or datetime.now(timezone.utc)).isoformat(timespec="seconds"),
+    }
+
+def parse_feed_stream(chunks, source, region, max_items=MAX_ITEMS_PER_FEED):
+    """Parses RSS 2.0, RSS 1.0 (RDF) or Atom from an iterable of byte chunks.
+
+    Items are handled on their end tag and then cleared, so memory stays at one item's worth.
+    """
+    parser = XMLPullParser(events=("end",))
+    articles = []
+    for chunk in chunks:
+        parser.feed(chunk)
+        for _, elem in parser.read_events():
+            if _local(elem.tag) in ("item", "entry"):
+                article = _item_to_article(elem, source, region)
+                if article:
+                    articles.append(article)
+                elem.clear()
+                if len(articles) >= max_items:
+                    return articles
+    parser.close()
+    return articles
+
+def _read_chunks(response, chunk_size=CHUNK_SIZE):
+    gzipped = (response.headers.get("Content-Encoding") or "").lower() == "gzip"
+    inflater = zlib.decompressobj(16 + zlib.MAX_WBITS) if gzipped else None
+    while True:
+        chunk = response.read(chunk_size)
+        if not chunk:
+            break
+        yield inflater.decompress(chunk) if inflater else chunk
+    if inflater:
+        yield inflater.flush()
+
+def fetch_feed(name, url, region="", state=None, timeout=TIMEOUT):
+    """Blocking fetch + parse of one feed. Returns a result dict; never raises.
+
+    status: "ok" (articles parsed), "not_modified" (304, nothing downloaded) or "error".
+    """
+    state = FEED_STATE if state is None else state
+    validators = state.get(name, {})
+    headers = {"User-Agent": USER_AGENT, "Accept-Encoding": "gzip"}
+    if validators.get("etag"):
+        headers["If-None-Match"] = validators["etag"]
+    if validators.get("last_modified"):
+        headers["If-Modified-Since"] = validators["last_modified"]
+
+    start = time.perf_counter()
+    result = {"name": name, "status": "error", "articles": [], "error": None}
+    try:
+        with urllib.request.urlopen(urllib.request.Request(url, headers=headers), timeout=timeout) as resp:
+            result["articles"] = parse_feed_stream(_read_chunks(resp), name, region)
+            state[name] = {
+                "etag": resp.headers.get("ETag"),
+                "last_modified": resp.headers.get("Last-Modified"),
+            }
+            result["status"] = "ok"
+    except urllib.error.HTTPError as e:
+        if e.code == 304:
+            result["status"] = "not_modified"
+        else:
+            result["error"] = f"HTTP {e.code}"
+    except (urllib.error.URLError, OSError, ParseError, zlib.error) as e:
+        result["error"] = str(getattr(e, "reason", e))
+    result["seconds"] = time.perf_counter() - start
+    return result
+
+async def fetch_all_async(feeds=None, state=None, timeout=TIMEOUT):
+    feeds = FEEDS if feeds is None else feeds
+    if not feeds:
+        return []
+    loop = asyncio.get_running_loop()
+    # one thread per feed (the default executor is sized by CPU count and would run them in waves)
+    with ThreadPoolExecutor(max_workers=len(feeds), thread_name_prefix="feed") as pool:
+        tasks = [
+            loop.run_in_executor(pool, fetch_feed, name, cfg["url"], cfg.get("region", ""), state, timeout)
+            for name, cfg in feeds.items()
+        ]
+        return await asyncio.gather(*tasks)
+
+def fetch_all(feeds=None, state=None, timeout=TIMEOUT):
+    """Fetches every feed concurrently. Returns {feed name: result dict}."""
+    results = asyncio.run(fetch_all_async(feeds, state, timeout))
+    return {r["name"]: r for r in results}
+
+def time_ago(published_iso, now=None):
+    published = parse_date(published_iso)
+    if published is None:
+        return ""
+    seconds = ((now or datetime.now(timezone.utc)) - published).total_seconds()
+    if seconds < 60:
+        return "Just now"
+    if seconds < 3600:
+        return f"{int(seconds // 60)} min ago"
+    if seconds < 86400:
+        hours = int(seconds // 3600)
+        return f"{hours} hr{'s' if hours != 1 else ''} ago"
+    days = int(seconds // 86400)
+    return f"{days} day{'s' if days != 1 else ''} ago"
+
+if __name__ == "__main__":
+    start = time.perf_counter()
+    for name, r in fetch_all().items():
+        print(f"{name:<20} {r['status']:<13} {len(r['articles']):>3} items  {r['seconds']:.2f}s  {r['error'] or ''}")
+    print(f"Total: {time.perf_counter() - start:.2f}s")
@@ -0,0 +1,82 @@
+import html
+import threading
+from collections import OrderedDict
+
+# --- CARD RENDERING ---
+# Every field is HTML-escaped (feed text is untrusted), each card's HTML is built once per
+# (id, version, relative time) and reused across reruns and sessions, and a page of cards goes
+# out as one markdown block instead of one st.markdown call per article.
+PAGE_SIZE = 20
+CACHE_SIZE = 4000
+
+_cache = OrderedDict()
+_lock = threading.Lock()
+
+CARD_TEMPLATE = """<div class="news-card">
+    <div style="display: flex; justify-content: space-between; align-items: center; margin-bottom: 10px;">
+        <div>
+            <span class="badge {cat_class}">{category}</span>
+            <span class="timestamp">🕒 {time}</span>
+        </div>
+        <span class="region-tag">{region}</span>
+    </div>
+    <h3 style="margin-top: 0; margin-bottom: 10px; font-size: 1.3em;">{headline}</h3>
+    <p style="color: #cbd5e1; line-height: 1.6;">{summary}</p>
+    <div style="border-top: 1px solid #334155; margin-top: 15px; padding-top: 10px; display: flex; justify-content: space-between;">
+        <span class="source-tag">Sources: {source}</span>
+        {link}
+    </div>
+</div>"""
+
+def safe_url(url):
+    """Only http(s) links make it into an href."""
+    url = (url or "").strip()
+    return url if url.lower().startswith(("http://", "https://")) else None
+
+def build_card(card):
+    esc = lambda key: html.escape(str(card.get(key) or ""))
+    url = safe_url(card.get("link"))
+    link = (
+        f'<a href="{html.escape(url)}" target="_blank" rel="noopener noreferrer" '
+        f'style="color: #60a5fa; text-decoration: none; font-size: 0.9em;">Read Full Story →</a>'
+        if url else ""
+    )
+    return CARD_TEMPLATE.format(
+        cat_class=esc("cat_class"),
+        category=html.escape(str(card.get("category") or "").upper()),
+        time=esc("time"),
+        region=esc("region"),
+        headline=esc("headline"),
+        summary=esc("summary"),
+        source=esc("source"),
+        link=link,
+    )
+
+def card_html(card):
+    """Memoized card HTML. The key includes the relative time so "2 hrs ago" doesn't go stale."""
+    key = (card.get("id") or card.get("headline"), card.get("version"), card.get("time"))
+    with _lock:
+        cached = _cache.get(key)
+        if cached is not None:
+            _cache.move_to_end(key)
+            return cached
+    rendered = build_card(card)
+    with _lock:
+        _cache[key] = rendered
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return rendered
+
+def page_count(total, page_size=PAGE_SIZE):
+    return max(1, -(-total // page_size))
+
+def clamp_page(page, total, page_size=PAGE_SIZE):
+    return min(max(page, 0), page_count(total, page_size) - 1)
+
+def page_slice(items, page, page_size=PAGE_SIZE):
+    start = clamp_page(page, len(items), page_size) * page_size
+    return items[start:start + page_size]
+
+def render_cards(cards):
+    """HTML for a page of cards as one string (one st.markdown call per page)."""
+    return "\n".join(card_html(c) for c in cards)
@@ -0,0 +1,219 @@
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+
+import news_ingest
+
+# --- SHARED NEWS STORE ---
+# One process-wide article table (SQLite, keyed by a hash of the article URL) kept fresh by a
+# single background scheduler that polls each feed on its own interval. Sessions never fetch:
+# they read the latest snapshot, which is cached in memory per store version.
+DB_PATH = "worldview_news.db"
+DEFAULT_INTERVAL = 10 * 60  # seconds between polls of one feed (override per feed with "interval")
+RETENTION_DAYS = 7
+SNAPSHOT_LIMIT = 500
+SNAPSHOT_CACHE_SIZE = 8
+MIN_MANUAL_REFRESH = 60  # seconds: "Update" clicks within this window just read the snapshot
+BUSY_TIMEOUT_MS = 5000
+
+ARTICLE_COLUMNS = ("id", "source", "region", "title", "link", "summary", "category", "published")
+
+def connect(path=DB_PATH):
+    conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT_MS / 1000, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+def init_schema(conn):
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS articles (
+            id TEXT PRIMARY KEY,
+            source TEXT NOT NULL,
+            region TEXT,
+            title TEXT NOT NULL,
+            link TEXT,
+            summary TEXT,
+            category TEXT,
+            published TEXT NOT NULL,
+            fetched_at TEXT NOT NULL
+        ) WITHOUT ROWID
+        """
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_articles_published ON articles (published)")
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS feed_state (
+            name TEXT PRIMARY KEY,
+            etag TEXT,
+            last_modified TEXT,
+            last_fetch REAL,
+            status TEXT,
+            error TEXT
+        )
+        """
+    )
+
+class NewsStore:
+    """Article table + in-memory snapshot cache. `version` changes whenever articles change."""
+    def __init__(self, path=DB_PATH):
+        self.path = path
+        self.version = 0
+        self._local = threading.local()
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        init_schema(self.connection())
+
+    def connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = connect(self.path)
+        return conn
+
+    def upsert(self, articles):
+        """Inserts new articles and updates edited ones. Returns True if anything changed."""
+        if not articles:
+            return False
+        conn = self.connection()
+        now = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        before = conn.total_changes
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(
+                "INSERT INTO articles (id, source, region, title, link, summary, category, published, fetched_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(id) DO UPDATE SET title = excluded.title, summary = excluded.summary, "
+                "category = excluded.category, fetched_at = excluded.fetched_at "
+                "WHERE articles.title != excluded.title OR IFNULL(articles.summary, '') != IFNULL(excluded.summary, '')",
+                [tuple(a.get(c) for c in ARTICLE_COLUMNS) + (now,) for a in articles],
+            )
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+        changed = conn.total_changes != before
+        if changed:
+            self._bump()
+        return changed
+
+    def prune(self, days=RETENTION_DAYS):
+        cutoff = (datetime.now(timezone.utc) - timedelta(days=days)).isoformat(timespec="seconds")
+        cur = self.connection().execute("DELETE FROM articles WHERE published < ?", (cutoff,))
+        if cur.rowcount:
+            self._bump()
+        return cur.rowcount
+
+    def _bump(self):
+        with self._cache_lock:
+            self.version += 1
+
+    def snapshot(self, limit=SNAPSHOT_LIMIT):
+        """Newest-first tuple of article dicts; one DB read per (version, limit), then memory."""
+        key = (self.version, limit)
+        with self._cache_lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+        rows = self.connection().execute(
+            f"SELECT {', '.join(ARTICLE_COLUMNS)} FROM articles ORDER BY published DESC LIMIT ?", (limit,)
+        ).fetchall()
+        articles = tuple(dict(zip(ARTICLE_COLUMNS, row)) for row in rows)
+        with self._cache_lock:
+            self._cache[key] = articles
+            while len(self._cache) > SNAPSHOT_CACHE_SIZE:
+                self._cache.popitem(last=False)
+        return articles
+
+    def load_feed_state(self):
+        """{name: {"etag", "last_modified", "last_fetch", "status", "error"}} from the last run."""
+        rows = self.connection().execute("SELECT name, etag, last_modified, last_fetch, status, error FROM feed_state")
+        return {
+            name: {"etag": etag, "last_modified": lm, "last_fetch": last, "status": status, "error": error}
+            for name, etag, lm, last, status, error in rows
+        }
+
+    def save_feed_state(self, name, state):
+        self.connection().execute(
+            "INSERT OR REPLACE INTO feed_state (name, etag, last_modified, last_fetch, status, error) VALUES (?, ?, ?, ?, ?, ?)",
+            (name, state.get("etag"), state.get("last_modified"), state.get("last_fetch"), state.get("status"), state.get("error")),
+        )
+
+class FeedScheduler:
+    """Single background thread that polls every feed when it's due and writes to the store."""
+    def __init__(self, store, feeds=None, default_interval=DEFAULT_INTERVAL):
+        self.store = store
+        self.feeds = news_ingest.FEEDS if feeds is None else feeds
+        self.default_interval = default_interval
+        self.state = store.load_feed_state()  # validators survive restarts -> first poll can be a 304
+        self.last_refresh = None
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._force = False
+        self._thread = None
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="news-scheduler", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def refresh_now(self, min_age=MIN_MANUAL_REFRESH):
+        """Asks the scheduler to poll every feed soon (doesn't block the caller).
+
+        Ignored if the last poll is younger than `min_age` seconds, so N users clicking "Update"
+        still cost upstream one fetch. Returns True if a poll was requested.
+        """
+        if self.last_refresh and (datetime.now() - self.last_refresh).total_seconds() < min_age:
+            return False
+        self._force = True
+        self._wake.set()
+        return True
+
+    def feed_status(self):
+        return {name: self.state.get(name, {}).get("status") for name in self.feeds}
+
+    def _interval(self, name):
+        return self.feeds[name].get("interval", self.default_interval)
+
+    def _due(self, now, force=False):
+        return {
+            name: cfg for name, cfg in self.feeds.items()
+            if force or now - (self.state.get(name, {}).get("last_fetch") or 0) >= self._interval(name)
+        }
+
+    def poll_once(self):
+        """Fetches the due feeds concurrently and stores the results. Returns seconds until the next due feed."""
+        now = time.time()
+        force, self._force = self._force, False
+        due = self._due(now, force)
+        if due:
+            results = news_ingest.fetch_all(due, self.state)
+            fresh = []
+            for name, result in results.items():
+                entry = self.state.setdefault(name, {})
+                entry.update(last_fetch=now, status=result["status"], error=result["error"])
+                self.store.save_feed_state(name, entry)
+                fresh.extend(result["articles"])
+            self.store.upsert(fresh)
+            self.store.prune()
+            self.last_refresh = datetime.now()
+        next_due = min(
+            (self.state.get(name, {}).get("last_fetch") or 0) + self._interval(name) for name in self.feeds
+        ) if self.feeds else now + self.default_interval
+        return max(1.0, next_due - time.time())
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                wait = self.poll_once()
+            except Exception:  # keep the thread alive; the next round retries
+                wait = 30.0
+            self._wake.wait(wait)
+            self._wake.clear()
@@ -0,0 +1,99 @@
+import hashlib
+import math
+import re
+import threading
+from collections import Counter, OrderedDict
+
+from news_cluster import STOPWORDS
+
+# --- STORY SUMMARIES ---
+# Local extractive summaries: the sentences of every report in a story are scored by TF-IDF
+# against the whole article collection and the best ones (minus near-repeats) are kept in their
+# original order. Document frequencies are updated as articles arrive rather than refit, and
+# finished summaries are cached by a hash of the story's content.
+MAX_SENTENCES = 3
+REDUNDANCY = 0.6  # skip a sentence sharing this much of its vocabulary with one already picked
+CACHE_SIZE = 5000
+
+_SENTENCES = re.compile(r"(?<=[.!?。！？])\s+")
+_WORDS = re.compile(r"\w+")
+
+def split_sentences(text):
+    return [s.strip() for s in _SENTENCES.split(text or "") if len(s.strip()) > 1]
+
+def terms(text):
+    return [w for w in _WORDS.findall(text.lower()) if w not in STOPWORDS and not w.isdigit()]
+
+def story_key(story):
+    digest = hashlib.sha1()
+    for article in sorted(story, key=lambda a: a["id"]):
+        digest.update(f"{article['id']}\0{article.get('title', '')}\0{article.get('summary', '')}\0".encode("utf-8"))
+    return digest.hexdigest()
+
+class Summarizer:
+    """Incremental IDF statistics + a content-addressed summary cache."""
+    def __init__(self, max_sentences=MAX_SENTENCES, cache_size=CACHE_SIZE):
+        self.max_sentences = max_sentences
+        self.cache_size = cache_size
+        self.doc_freq = Counter()
+        self.n_docs = 0
+        self._seen = set()
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def observe(self, articles):
+        """Adds unseen articles to the document-frequency table (each article is one document)."""
+        with self._lock:
+            for article in articles:
+                if article["id"] in self._seen:
+                    continue
+                self._seen.add(article["id"])
+                self.n_docs += 1
+                self.doc_freq.update(set(terms(f"{article.get('title', '')} {article.get('summary', '')}")))
+
+    def idf(self, term):
+        return math.log((1 + self.n_docs) / (1 + self.doc_freq.get(term, 0))) + 1.0
+
+    def summarize(self, story):
+        """Summary text for a story (list of article dicts). Cached until the story's content changes."""
+        key = story_key(story)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+        self.observe(story)
+        summary = self._extract(story)
+        with self._lock:
+            self._cache[key] = summary
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return summary
+
+    def _extract(self, story):
+        candidates = []  # (position, sentence, term set, score)
+        seen_text = set()
+        for article in story:
+            headline_terms = set(terms(article.get("title", "")))
+            for i, sentence in enumerate(split_sentences(article.get("summary", ""))):
+                if sentence in seen_text:
+                    continue  # wire copy repeated verbatim by several outlets
+                seen_text.add(sentence)
+                words = terms(sentence)
+                if not words:
+                    continue
+                tf = Counter(words)
+                score = sum(count * self.idf(t) for t, count in tf.items()) / math.sqrt(len(words))
+                score *= 1.0 + 0.5 * len(headline_terms & tf.keys()) / (len(headline_terms) or 1)
+                score *= 1.2 if i == 0 else 1.0  # lead sentences carry the news
+                candidates.append((len(candidates), sentence, set(tf), score))
+        if len(candidates) <= 1:
+            return candidates[0][1] if candidates else (story[0].get("summary") or "")
+
+        picked = []
+        for cand in sorted(candidates, key=lambda c: c[3], reverse=True):
+            if any(len(cand[2] & p[2]) / len(cand[2] | p[2]) >= REDUNDANCY for p in picked):
+                continue
+            picked.append(cand)
+            if len(picked) == self.max_sentences:
+                break
+        return " ".join(c[1] for c in sorted(picked, key=lambda c: c[0]))
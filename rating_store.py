@@ -0,0 +1,234 @@
+import argparse
+import datetime
+import os
+import sqlite3
+import threading
+
+# --- CONFIGURATION ---
+# next to this file, so the cron batch job, --accuracy and the app all share one database
+DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ratings.db")
+HORIZON_DAYS = 90         # How far ahead we check whether a rating "came true"
+NEUTRAL_BAND = 0.05       # Hold/Neutral ratings count as hits if the move stays within +/-5%
+PRIOR_HIT_RATE = 0.6      # Credibility assumed for a firm we know nothing about
+PRIOR_WEIGHT = 10         # Pseudo-ratings blended in so a firm with 2 lucky calls isn't rated 1.0
+MIN_CREDIBILITY = 0.2
+MAX_CREDIBILITY = 0.95
+
+BULLISH_GRADES = "buy|outperform|overweight"
+BEARISH_GRADES = "sell|underperform|underweight"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS ratings (
+    firm TEXT NOT NULL,
+    ticker TEXT NOT NULL,
+    grade_date TEXT NOT NULL,
+    action TEXT,
+    from_grade TEXT,
+    to_grade TEXT,
+    PRIMARY KEY (firm, ticker, grade_date)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_ratings_ticker_date ON ratings (ticker, grade_date);
+
+CREATE TABLE IF NOT EXISTS prices (
+    ticker TEXT NOT NULL,
+    price_date TEXT NOT NULL,
+    close REAL,
+    PRIMARY KEY (ticker, price_date)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS firm_accuracy (
+    firm TEXT PRIMARY KEY,
+    n_ratings INTEGER,
+    hits INTEGER,
+    hit_rate REAL,
+    credibility REAL,
+    updated_at TEXT
+);
+"""
+
+# --- STORAGE ---
+def connect(path=DB_PATH):
+    """Opens the rating store and makes sure the tables exist."""
+    conn = sqlite3.connect(path, timeout=30)
+    conn.executescript(SCHEMA)
+    return conn
+
+def _iso(value):
+    """Normalizes a Timestamp/datetime/date index value to an ISO string that sorts correctly."""
+    if hasattr(value, "to_pydatetime"):
+        value = value.to_pydatetime()
+    if isinstance(value, datetime.datetime):
+        return value.replace(tzinfo=None).isoformat(sep=" ", timespec="seconds")
+    if isinstance(value, datetime.date):
+        return value.isoformat()
+    return str(value)[:19]
+
+def ingest_ratings(conn, ticker, upgrades_df):
+    """Stores every upgrade/downgrade row; only rows newer than what we already hold are written."""
+    if upgrades_df is None or upgrades_df.empty:
+        return 0
+    last = conn.execute("SELECT MAX(grade_date) FROM ratings WHERE ticker = ?", (ticker,)).fetchone()[0]
+
+    rows = []
+    for grade_date, row in zip(upgrades_df.index, upgrades_df.itertuples(index=False)):
+        iso_date = _iso(grade_date)
+        if last and iso_date < last:
+            continue
+        rows.append((
+            str(getattr(row, "Firm", "Unknown")), ticker, iso_date,
+            getattr(row, "Action", None), getattr(row, "FromGrade", None), getattr(row, "ToGrade", None),
+        ))
+    with conn:
+        conn.executemany("INSERT OR IGNORE INTO ratings VALUES (?, ?, ?, ?, ?, ?)", rows)
+    return len(rows)
+
+def ingest_prices(conn, ticker, close_series):
+    """Stores daily closes for a ticker (a Series indexed by date)."""
+    rows = [(ticker, _iso(d)[:10], float(c)) for d, c in close_series.dropna().items()]
+    with conn:
+        conn.executemany("INSERT OR REPLACE INTO prices VALUES (?, ?, ?)", rows)
+    return len(rows)
+
+def refresh_prices(conn, tickers=None):
+    """Downloads only the missing tail of price history for every rated ticker."""
+    import yfinance as yf
+
+    if tickers is None:
+        tickers = [t for (t,) in conn.execute("SELECT DISTINCT ticker FROM ratings")]
+    today = datetime.date.today()
+    for ticker in tickers:
+        last_price, first_rating = conn.execute(
+            "SELECT (SELECT MAX(price_date) FROM prices WHERE ticker = ?), "
+            "(SELECT MIN(grade_date) FROM ratings WHERE ticker = ?)", (ticker, ticker)
+        ).fetchone()
+        start = last_price or (first_rating or str(today - datetime.timedelta(days=365)))[:10]
+        if start >= str(today):
+            continue
+        try:
+            hist = yf.download(ticker, start=start, progress=False, auto_adjust=True)
+        except Exception as e:
+            print(f"   ⚠️ Price refresh failed for {ticker}: {e}")
+            continue
+        if hist is None or hist.empty:
+            continue
+        close = hist["Close"]
+        if hasattr(close, "columns"):  # newer yfinance returns a (field, ticker) column index
+            close = close.iloc[:, 0]
+        ingest_prices(conn, ticker, close)
+
+# --- ACCURACY JOB ---
+def compute_firm_accuracy(conn, horizon_days=HORIZON_DAYS):
+    """Scores every firm by how often its ratings matched the price move `horizon_days` later.
+
+    Uses two as-of joins (price at the rating date, price at rating date + horizon) over the
+    whole table at once, so it stays vectorized for millions of ratings.
+    """
+    import numpy as np
+    import pandas as pd
+
+    ratings = pd.read_sql_query("SELECT firm, ticker, grade_date, to_grade FROM ratings", conn)
+    prices = pd.read_sql_query("SELECT ticker, price_date, close FROM prices", conn)
+    if ratings.empty or prices.empty:
+        return pd.DataFrame(columns=["firm", "n_ratings", "hits", "hit_rate", "credibility"])
+
+    ratings["grade_date"] = pd.to_datetime(ratings["grade_date"]).dt.normalize()
+    ratings["exit_date"] = ratings["grade_date"] + pd.Timedelta(days=horizon_days)
+    prices["price_date"] = pd.to_datetime(prices["price_date"])
+    prices = prices.sort_values("price_date")
+
+    # Only score ratings whose horizon has fully elapsed in our stored history
+    last_price = prices.groupby("ticker")["price_date"].max().rename("last_price")
+    ratings = ratings.join(last_price, on="ticker")
+    ratings = ratings[ratings["exit_date"] <= ratings["last_price"]]
+    if ratings.empty:
+        return pd.DataFrame(columns=["firm", "n_ratings", "hits", "hit_rate", "credibility"])
+
+    entry = pd.merge_asof(
+        ratings.sort_values("grade_date"), prices.rename(columns={"close": "entry"}),
+        left_on="grade_date", right_on="price_date", by="ticker", direction="backward",
+    ).drop(columns="price_date")
+    scored = pd.merge_asof(
+        entry.sort_values("exit_date"), prices.rename(columns={"close": "exit"}),
+        left_on="exit_date", right_on="price_date", by="ticker", direction="backward",
+    ).dropna(subset=["entry", "exit"])
+
+    ret = scored["exit"] / scored["entry"] - 1
+    grade = scored["to_grade"].fillna("").str.lower()
+    bullish = grade.str.contains(BULLISH_GRADES)
+    bearish = grade.str.contains(BEARISH_GRADES) & ~bullish
+    scored["hit"] = np.where(bullish, ret > 0, np.where(bearish, ret < 0, ret.abs() <= NEUTRAL_BAND))
+
+    stats = scored.groupby("firm")["hit"].agg(n_ratings="size", hits="sum").reset_index()
+    stats["hit_rate"] = stats["hits"] / stats["n_ratings"]
+    stats["credibility"] = ((stats["hits"] + PRIOR_HIT_RATE * PRIOR_WEIGHT) / (stats["n_ratings"] + PRIOR_WEIGHT)).clip(
+        MIN_CREDIBILITY, MAX_CREDIBILITY
+    )
+
+    now = datetime.datetime.now().isoformat(timespec="seconds")
+    with conn:
+        conn.execute("DELETE FROM firm_accuracy")
+        conn.executemany(
+            "INSERT INTO firm_accuracy VALUES (?, ?, ?, ?, ?, ?)",
+            [(r.firm, int(r.n_ratings), int(r.hits), float(r.hit_rate), float(r.credibility), now)
+             for r in stats.itertuples(index=False)],
+        )
+    reset_credibility_index()
+    return stats
+
+# --- IN-MEMORY CREDIBILITY INDEX ---
+_index = None
+_index_lock = threading.Lock()
+
+def load_credibility_index(path=DB_PATH):
+    """Reads firm -> credibility into a dict (done once; scoring never touches the DB again)."""
+    conn = connect(path)
+    try:
+        return {firm: cred for firm, cred in conn.execute("SELECT firm, credibility FROM firm_accuracy")}
+    finally:
+        conn.close()
+
+def reset_credibility_index():
+    global _index
+    with _index_lock:
+        _index = None
+
+def firm_credibility(firm, default):
+    """Realized-accuracy credibility for a firm, or `default` if the batch job hasn't scored it yet."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                try:
+                    _index = load_credibility_index()
+                except sqlite3.Error:
+                    _index = {}
+    return _index.get(firm, default)
+
+def record_upgrades(ticker, upgrades_df):
+    """Ingests a freshly fetched upgrades/downgrades table; storage errors never break scoring."""
+    try:
+        conn = connect()
+        try:
+            return ingest_ratings(conn, ticker, upgrades_df)
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        print(f"   ⚠️ Could not store ratings for {ticker}: {e}")
+        return 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Maintain the analyst rating history and firm accuracy scores.")
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--refresh-prices", action="store_true", help="download missing price history for rated tickers")
+    parser.add_argument("--accuracy", action="store_true", help="recompute each firm's realized hit rate")
+    parser.add_argument("--horizon", type=int, default=HORIZON_DAYS)
+    args = parser.parse_args()
+
+    conn = connect(args.db)
+    if args.refresh_prices:
+        refresh_prices(conn)
+    if args.accuracy:
+        stats = compute_firm_accuracy(conn, args.horizon)
+        print(stats.sort_values("credibility", ascending=False).to_string(index=False))
+    n = conn.execute("SELECT COUNT(*) FROM ratings").fetchone()[0]
+    print(f"📚 {n} ratings stored in {args.db}")
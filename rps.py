@@ -1,37 +1,38 @@
-from random import randint #This is running in Python3.
+import argparse #This is running in Python3.
 
-#create a list of play options
-t = ["Rock", "Paper", "Scissors"]
+import numpy as np
 
-#assign a random play to the computer
-computer = t[randint(0,2)]
+from rps_engine import MOVES, OPPONENTS, OUTCOME, VERBS, make_strategy, parse_move
 
-#set player to False
-player = False
+#pick the computer's strategy: "ngram" learns your habits, "random" is the classic game
+parser = argparse.ArgumentParser(description="Play Rock, Paper, Scissors against the computer.")
+parser.add_argument("--opponent", choices=OPPONENTS, default="random")
+args = parser.parse_args()
 
-while player == False:
-#set player to True
-    player = input("Rock, Paper, Scissors?")
-    if player == computer:
-        print("Tie!")
-    elif player == "Rock":
-        if computer == "Paper":
-            print("You Lose!", computer, "covers", player)
-        else:
-            print("You Win!", player, "smashes", computer)
-    elif player == "Paper":
-        if computer == "Scissors":
-            print("You Lose", computer, "cut",player)
-        else:
-            print("You Win!", player, "covers", computer)
-    elif player == "Scissors":
-        if computer == "Rock":
-            print("You Lose....", computer, "smashes", player)
-        else:
-            print("You win!", player, "cut", computer)
-    else:
+#the computer's strategy (rps_engine.py has the same moves and outcome table used by the simulator)
+computer_strategy = make_strategy(args.opponent)
+computer_strategy.reset(np.random.default_rng())
+
+def describe(player, computer):
+    """Message for one round, looked up from the shared outcome table."""
+    result = OUTCOME[player][computer]
+    if result == 0:
+        return "Tie!"
+    if result > 0:
+        return f"You Win! {MOVES[player]} {VERBS[(player, computer)]} {MOVES[computer]}"
+    return f"You Lose! {MOVES[computer]} {VERBS[(computer, player)]} {MOVES[player]}"
+
+while True:
+    try:
+        answer = input("Rock, Paper, Scissors?")
+    except EOFError:
+        break
+    player = parse_move(answer)
+    if player is None:
         print("That's not a valid play. Check your spelling!")
+        continue
 
-    #player was set to True, but we want it to be Flase so loop continues
-    player = False
-    computer = t[randint(0,2)]
+    #assign a play to the computer before it learns the player's move
+    computer = computer_strategy.next_move()
+    print(describe(player, computer))
+    computer_strategy.observe(computer, player)
@@ -0,0 +1,418 @@
+import argparse
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+# --- ROCK PAPER SCISSORS ENGINE ---
+# Moves are small ints and every outcome is a lookup in one 3x3 table, so a whole match of
+# pre-drawn moves resolves with a single NumPy fancy-index. Strategies that ignore the opponent
+# draw their moves in bulk; adaptive ones compute a whole reply sequence from the opponent's
+# moves with cumulative sums. Only adaptive-vs-adaptive matches fall back to a per-round loop.
+#   python rps_engine.py --rounds 1000000
+#   python rps_engine.py --bench
+#   python rps_engine.py --vs-humans
+ROCK, PAPER, SCISSORS = 0, 1, 2
+MOVES = ("Rock", "Paper", "Scissors")
+
+# OUTCOME[a][b]: 1 if a beats b, -1 if a loses, 0 for a tie
+OUTCOME = (
+    (0, -1, 1),
+    (1, 0, -1),
+    (-1, 1, 0),
+)
+PAYOFF = np.array(OUTCOME, dtype=np.int8)
+
+# (winner, loser) -> verb, for the interactive game
+VERBS = {(ROCK, SCISSORS): "smashes", (PAPER, ROCK): "covers", (SCISSORS, PAPER): "cut"}
+
+CHUNK = 1 << 16  # rounds per vectorized block (bounds memory of the cumulative-count arrays)
+
+NGRAM_ORDER = 3          # longest context, in rounds
+NGRAM_MAX_CONTEXTS = 2048
+NGRAM_MIN_EVIDENCE = 2   # a context needs this many observations before it is trusted
+NGRAM_COUNT_CAP = 24     # counts are halved past this, so the model follows a player who changes habits
+
+def beats(move):
+    """The move that beats `move` (works on ints and arrays)."""
+    return (move + 1) % 3
+
+def _argmax3(counts):
+    # plain-Python argmax (first max, like np.argmax): the per-round path avoids NumPy scalars
+    a, b, c = counts
+    if a >= b:
+        return 0 if a >= c else 2
+    return 1 if b >= c else 2
+
+def parse_move(text):
+    """'rock' / 'R' / 'Rock' -> 0 etc.; None if it isn't a move."""
+    text = (text or "").strip().lower()
+    for i, name in enumerate(MOVES):
+        if text and name.lower().startswith(text):
+            return i
+    return None
+
+def outcomes(a_moves, b_moves):
+    """Vectorized results from a's point of view (int8 array of 1 / 0 / -1)."""
+    return PAYOFF[a_moves, b_moves]
+
+def tally(results):
+    """(a wins, b wins, ties) from an outcomes() array."""
+    counts = np.bincount(results.astype(np.int64) + 1, minlength=3)
+    return int(counts[2]), int(counts[0]), int(counts[1])
+
+# -----------------------
+# Strategies
+# -----------------------
+class Strategy:
+    """Base player.
+
+    Sequential API: next_move() then observe(own, opp) after each round.
+    Non-adaptive strategies (adaptive = False) also implement moves(n): n moves in one draw.
+    Adaptive strategies may implement respond(opp_moves): own move t may only use opp_moves[:t].
+    """
+    name = "base"
+    adaptive = False
+
+    def reset(self, rng):
+        self.rng = rng
+
+    def next_move(self):
+        raise NotImplementedError
+
+    def observe(self, own, opp):
+        pass
+
+    def moves(self, n):
+        return np.fromiter((self.next_move() for _ in range(n)), dtype=np.int64, count=n)
+
+    def respond(self, opp_moves):
+        out = np.empty(len(opp_moves), dtype=np.int64)
+        for t, opp in enumerate(opp_moves):
+            out[t] = own = self.next_move()
+            self.observe(own, int(opp))
+        return out
+
+class RandomStrategy(Strategy):
+    name = "random"
+
+    def next_move(self):
+        return int(self.rng.integers(3))  # per-round path only; matches use moves()
+
+    def moves(self, n):
+        return self.rng.integers(0, 3, size=n)
+
+class CycleStrategy(Strategy):
+    """Scripted: repeats a fixed pattern, e.g. 'RRP' or 'RPS'."""
+    def __init__(self, pattern="RPS"):
+        self.pattern = np.array([parse_move(c) for c in pattern], dtype=np.int64)
+        self.name = f"cycle-{pattern}"
+
+    def reset(self, rng):
+        super().reset(rng)
+        self.pos = 0
+
+    def next_move(self):
+        move = int(self.pattern[self.pos % len(self.pattern)])
+        self.pos += 1
+        return move
+
+    def moves(self, n):
+        out = self.pattern[(self.pos + np.arange(n)) % len(self.pattern)]
+        self.pos += n
+        return out
+
+class FrequencyStrategy(Strategy):
+    """Plays what beats the opponent's most frequent move so far."""
+    name = "frequency"
+    adaptive = True
+
+    def reset(self, rng):
+        super().reset(rng)
+        self.counts = [0, 0, 0]
+
+    def next_move(self):
+        return beats(_argmax3(self.counts))
+
+    def observe(self, own, opp):
+        self.counts[opp] += 1
+
+    def respond(self, opp_moves):
+        out = np.empty(len(opp_moves), dtype=np.int64)
+        counts = np.array(self.counts, dtype=np.int64)
+        for start in range(0, len(opp_moves), CHUNK):
+            block = opp_moves[start:start + CHUNK]
+            onehot = np.eye(3, dtype=np.int64)[block]
+            seen = counts + np.cumsum(onehot, axis=0) - onehot  # counts before each round
+            out[start:start + len(block)] = beats(np.argmax(seen, axis=1))
+            counts += onehot.sum(axis=0)
+        self.counts = counts.tolist()
+        return out
+
+class MarkovStrategy(Strategy):
+    """Order-1 Markov chain over the opponent's moves: predicts their reply to their last move."""
+    name = "markov"
+    adaptive = True
+
+    def reset(self, rng):
+        super().reset(rng)
+        self.trans = [[0, 0, 0], [0, 0, 0], [0, 0, 0]]
+        self.last = None
+
+    def next_move(self):
+        if self.last is None:
+            return int(self.rng.integers(3))
+        return beats(_argmax3(self.trans[self.last]))
+
+    def observe(self, own, opp):
+        if self.last is not None:
+            self.trans[self.last][opp] += 1
+        self.last = opp
+
+    def respond(self, opp_moves):
+        n = len(opp_moves)
+        out = np.empty(n, dtype=np.int64)
+        trans = np.array(self.trans, dtype=np.int64)
+        for start in range(0, n, CHUNK):
+            block = np.asarray(opp_moves[start:start + CHUNK], dtype=np.int64)
+            m = len(block)
+            # prev[t] = the opponent move before round t (-1 at the very first round)
+            prev = np.empty(m, dtype=np.int64)
+            prev[0] = -1 if self.last is None else self.last
+            prev[1:] = block[:-1]
+            # pair t = (prev[t], block[t]) becomes known only after round t -> exclusive cumsum
+            pairs = np.zeros((m, 9), dtype=np.int64)
+            valid = prev >= 0
+            pairs[np.nonzero(valid)[0], prev[valid] * 3 + block[valid]] = 1
+            seen = trans.reshape(9) + np.cumsum(pairs, axis=0) - pairs
+            rows = seen.reshape(m, 3, 3)[np.arange(m), np.maximum(prev, 0)]
+            moves = beats(np.argmax(rows, axis=1))
+            if not valid[0]:
+                moves[0] = self.rng.integers(3)
+            out[start:start + m] = moves
+            trans += pairs.sum(axis=0).reshape(3, 3)
+            self.last = int(block[-1])
+        self.trans = trans.tolist()
+        return out
+
+class NGramStrategy(Strategy):
+    """Online n-gram predictor of the opponent's next move, O(1) work per round.
+
+    Each round is one symbol (opp * 3 + own, so reactions to wins and losses are visible). For
+    every order k <= NGRAM_ORDER a rolling base-9 code of the last k symbols indexes a count array
+    of the opponent's following move. Prediction backs off from the longest context with enough
+    evidence to shorter ones. Contexts live in an LRU-bounded OrderedDict, so rare ones are evicted.
+    """
+    name = "ngram"
+    adaptive = True
+
+    def __init__(self, order=NGRAM_ORDER, max_contexts=NGRAM_MAX_CONTEXTS):
+        self.order = int(order)
+        self.max_contexts = max_contexts
+
+    def reset(self, rng):
+        super().reset(rng)
+        self.contexts = OrderedDict()   # (k, code) -> [count rock, count paper, count scissors]
+        self.codes = [0] * (self.order + 1)  # codes[k]: last k symbols in base 9
+        self.seen = 0                        # rounds observed (contexts shorter than k until seen >= k)
+        self.moduli = [9 ** k for k in range(self.order + 1)]
+
+    def predict(self):
+        """The opponent's most likely next move, or None without enough evidence."""
+        for k in range(min(self.order, self.seen), -1, -1):
+            counts = self.contexts.get((k, self.codes[k]))
+            if counts is not None and sum(counts) >= NGRAM_MIN_EVIDENCE:
+                return _argmax3(counts)
+        return None
+
+    def next_move(self):
+        predicted = self.predict()
+        return int(self.rng.integers(3)) if predicted is None else beats(predicted)
+
+    def observe(self, own, opp):
+        contexts = self.contexts
+        for k in range(min(self.order, self.seen) + 1):
+            key = (k, self.codes[k])
+            counts = contexts.get(key)
+            if counts is None:
+                counts = contexts[key] = [0, 0, 0]
+                if len(contexts) > self.max_contexts:
+                    contexts.popitem(last=False)
+            else:
+                contexts.move_to_end(key)
+            counts[opp] += 1
+            if counts[opp] > NGRAM_COUNT_CAP:
+                counts[0] >>= 1
+                counts[1] >>= 1
+                counts[2] >>= 1
+        symbol = opp * 3 + own
+        self.codes = [(code * 9 + symbol) % m for code, m in zip(self.codes, self.moduli)]
+        self.seen += 1
+
+# -----------------------
+# Scripted "human" players for the harness
+# -----------------------
+class BiasedStrategy(Strategy):
+    """Random with a favourite: 'RRPS' plays Rock half the time."""
+    def __init__(self, pattern="RRPS"):
+        moves = [parse_move(c) for c in pattern]
+        self.weights = np.bincount(moves, minlength=3) / len(moves)
+        self.name = f"biased-{pattern}"
+
+    def next_move(self):
+        return int(self.rng.choice(3, p=self.weights))
+
+    def moves(self, n):
+        return self.rng.choice(3, size=n, p=self.weights)
+
+class WinStayLoseShift(Strategy):
+    """Repeats a winning move, switches to the move that would have won after a loss or tie."""
+    name = "wsls"
+    adaptive = True
+
+    def reset(self, rng):
+        super().reset(rng)
+        self.last = int(rng.integers(3))
+
+    def next_move(self):
+        return self.last
+
+    def observe(self, own, opp):
+        self.last = own if OUTCOME[own][opp] > 0 else beats(opp)
+
+class BeatLastStrategy(Strategy):
+    """Plays whatever would have beaten the opponent's previous move (a very common habit)."""
+    name = "beatlast"
+    adaptive = True
+
+    def reset(self, rng):
+        super().reset(rng)
+        self.last = None
+
+    def next_move(self):
+        return int(self.rng.integers(3)) if self.last is None else beats(self.last)
+
+    def observe(self, own, opp):
+        self.last = opp
+
+STRATEGIES = {
+    "random": RandomStrategy,
+    "frequency": FrequencyStrategy,
+    "markov": MarkovStrategy,
+    "ngram": NGramStrategy,
+    "cycle": CycleStrategy,
+    "biased": BiasedStrategy,
+    "wsls": WinStayLoseShift,
+    "beatlast": BeatLastStrategy,
+}
+OPPONENTS = ("random", "frequency", "markov", "ngram")  # sensible computer players for rps.py
+
+def make_strategy(name):
+    """'random', 'frequency', 'markov', 'ngram[:order]', 'cycle:RRP', 'biased:RRPS', 'wsls', 'beatlast'."""
+    kind, _, arg = name.partition(":")
+    if kind not in STRATEGIES:
+        raise ValueError(f"unknown strategy {name!r} (choose from {', '.join(STRATEGIES)})")
+    return STRATEGIES[kind](arg) if arg else STRATEGIES[kind]()
+
+# -----------------------
+# Matches & tournaments
+# -----------------------
+def play_match(a, b, rounds, seed=None):
+    """Plays `rounds` rounds of a vs b. Returns (a wins, b wins, ties)."""
+    rng = np.random.default_rng(seed)
+    a.reset(np.random.default_rng(rng.integers(1 << 63)))
+    b.reset(np.random.default_rng(rng.integers(1 << 63)))
+
+    if not a.adaptive and not b.adaptive:
+        a_moves, b_moves = a.moves(rounds), b.moves(rounds)
+    elif not b.adaptive:
+        b_moves = b.moves(rounds)
+        a_moves = a.respond(b_moves)
+    elif not a.adaptive:
+        a_moves = a.moves(rounds)
+        b_moves = b.respond(a_moves)
+    else:
+        return _play_sequential(a, b, rounds)
+    return tally(outcomes(a_moves, b_moves))
+
+def _play_sequential(a, b, rounds):
+    a_wins = b_wins = 0
+    for _ in range(rounds):
+        ma, mb = a.next_move(), b.next_move()
+        a.observe(ma, mb)
+        b.observe(mb, ma)
+        result = OUTCOME[ma][mb]
+        if result > 0:
+            a_wins += 1
+        elif result < 0:
+            b_wins += 1
+    return a_wins, b_wins, rounds - a_wins - b_wins
+
+def round_robin(names, rounds=100_000, seed=0):
+    """Every strategy plays every other once. Returns rows sorted by points (win 1, tie 0.5)."""
+    rng = np.random.default_rng(seed)
+    points = {n: 0.0 for n in names}
+    matches = []
+    for i, a_name in enumerate(names):
+        for b_name in names[i + 1:]:
+            wins_a, wins_b, ties = play_match(make_strategy(a_name), make_strategy(b_name), rounds, rng.integers(1 << 63))
+            points[a_name] += wins_a + ties / 2
+            points[b_name] += wins_b + ties / 2
+            matches.append((a_name, b_name, wins_a, wins_b, ties))
+    games = rounds * max(1, len(names) - 1)
+    standings = sorted(((n, p / games) for n, p in points.items()), key=lambda r: r[1], reverse=True)
+    return standings, matches
+
+def benchmark(rounds=1_000_000):
+    """Rounds per second for each match type."""
+    cases = [
+        ("random", "random", rounds),
+        ("frequency", "random", rounds),
+        ("markov", "cycle:RRPS", rounds),
+        ("markov", "frequency", rounds // 5),  # adaptive vs adaptive: per-round loop
+        ("ngram", "random", rounds // 5),      # online predictor: O(1) per round
+    ]
+    for a_name, b_name, n in cases:
+        start = time.perf_counter()
+        play_match(make_strategy(a_name), make_strategy(b_name), n, seed=1)
+        elapsed = time.perf_counter() - start
+        print(f"{a_name:>10} vs {b_name:<12} {n:>9,} rounds  {n / elapsed / 1e6:7.2f} M rounds/s")
+
+HUMAN_PATTERNS = ["cycle:RPS", "cycle:RRPPSS", "biased:RRPS", "wsls", "beatlast", "random"]
+
+def vs_humans(opponents=OPPONENTS, patterns=HUMAN_PATTERNS, rounds=5_000, seed=0):
+    """Win rate of each computer opponent against scripted human-like players."""
+    rng = np.random.default_rng(seed)
+    table = {}
+    for opponent in opponents:
+        for pattern in patterns:
+            wins, losses, ties = play_match(make_strategy(opponent), make_strategy(pattern), rounds, rng.integers(1 << 63))
+            table[opponent, pattern] = (wins / rounds, losses / rounds)
+    return table
+
+DEFAULT_FIELD = ["random", "frequency", "markov", "ngram", "cycle:RPS", "cycle:RRP"]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rock-Paper-Scissors strategy tournament.")
+    parser.add_argument("--rounds", type=int, default=100_000, help="rounds per match")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--strategies", nargs="+", default=DEFAULT_FIELD)
+    parser.add_argument("--bench", action="store_true", help="measure simulation throughput instead")
+    parser.add_argument("--vs-humans", action="store_true", help="win rates of the computer opponents vs scripted human patterns")
+    args = parser.parse_args()
+
+    if args.bench:
+        benchmark(max(args.rounds, 1_000_000))
+    elif args.vs_humans:
+        table = vs_humans(rounds=min(args.rounds, 20_000), seed=args.seed)
+        print(f"{'computer':<10}" + "".join(f"{p:>14}" for p in HUMAN_PATTERNS))
+        for opponent in OPPONENTS:
+            print(f"{opponent:<10}" + "".join(f"{table[opponent, p][0]:>13.0%} " for p in HUMAN_PATTERNS))
+        print("(share of rounds the computer wins; 33% is chance)")
+    else:
+        standings, matches = round_robin(args.strategies, args.rounds, args.seed)
+        for a_name, b_name, wins_a, wins_b, ties in matches:
+            print(f"{a_name:>12} {wins_a:>8} - {wins_b:<8} {b_name:<12} ({ties} ties)")
+        print("\nStandings (points per round):")
+        for name, score in standings:
+            print(f"  {name:<12} {score:.3f}")
@@ -0,0 +1,154 @@
+import argparse
+import datetime
+import json
+import os
+import sqlite3
+
+# --- CONFIGURATION ---
+# next to this file, so cron jobs (any working directory) and the app share one history
+DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "scan_history.db")
+KINDS = ("trend", "mean_reversion", "failed")
+PERSISTENCE_WINDOW = 365  # scans looked back over when counting how long a signal has lasted
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scans (
+    scan_date TEXT PRIMARY KEY,
+    finished_at TEXT NOT NULL,
+    n_tickers INTEGER
+);
+
+CREATE TABLE IF NOT EXISTS signals (
+    scan_date TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    ticker TEXT NOT NULL,
+    close REAL,
+    adx REAL,
+    rsi REAL,
+    rr REAL,
+    payload TEXT,
+    PRIMARY KEY (scan_date, kind, ticker)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_signals_ticker ON signals (ticker, kind, scan_date);
+"""
+
+# --- STORAGE ---
+def connect(path=DB_PATH):
+    """Opens the scan history and makes sure the tables exist."""
+    conn = sqlite3.connect(path, timeout=30)
+    conn.executescript(SCHEMA)
+    return conn
+
+def _num(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+def record_scan(conn, trend_rows, mean_rev_rows, failed_tickers, scan_date=None, n_tickers=None):
+    """Stores one scan (a re-run on the same day replaces that day's rows). Returns the scan date."""
+    scan_date = scan_date or datetime.date.today().isoformat()
+    rows = []
+    for kind, signals in (("trend", trend_rows), ("mean_reversion", mean_rev_rows)):
+        for sig in signals:
+            rows.append((
+                scan_date, kind, sig["Ticker"], _num(sig.get("Close")), _num(sig.get("ADX")),
+                _num(sig.get("RSI")), _num(sig.get("R_R")), json.dumps(sig, default=str),
+            ))
+    rows += [(scan_date, "failed", t, None, None, None, None, None) for t in failed_tickers]
+
+    with conn:
+        conn.execute("DELETE FROM signals WHERE scan_date = ?", (scan_date,))
+        conn.executemany("INSERT OR REPLACE INTO signals VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        conn.execute(
+            "INSERT OR REPLACE INTO scans VALUES (?, ?, ?)",
+            (scan_date, datetime.datetime.now().isoformat(timespec="seconds"), n_tickers),
+        )
+    return scan_date
+
+# --- QUERIES ---
+def scan_dates(conn, limit=PERSISTENCE_WINDOW, until=None):
+    """Most recent scan dates first (optionally only those on or before `until`)."""
+    if until:
+        rows = conn.execute("SELECT scan_date FROM scans WHERE scan_date <= ? ORDER BY scan_date DESC LIMIT ?", (until, limit))
+    else:
+        rows = conn.execute("SELECT scan_date FROM scans ORDER BY scan_date DESC LIMIT ?", (limit,))
+    return [r[0] for r in rows]
+
+def latest_scan_date(conn):
+    dates = scan_dates(conn, limit=1)
+    return dates[0] if dates else None
+
+def load_signals(conn, scan_date, kind):
+    """The full signal rows (as the scanner produced them) of one scan and kind."""
+    rows = conn.execute(
+        "SELECT ticker, payload FROM signals WHERE scan_date = ? AND kind = ? ORDER BY ticker", (scan_date, kind)
+    )
+    return [json.loads(payload) if payload else {"Ticker": ticker} for ticker, payload in rows]
+
+def _tickers(conn, scan_date, kind):
+    return {r[0] for r in conn.execute("SELECT ticker FROM signals WHERE scan_date = ? AND kind = ?", (scan_date, kind))}
+
+def diff_since_previous(conn, kind, scan_date=None):
+    """{"new", "dropped", "kept"} ticker sets versus the scan before `scan_date` (default: latest)."""
+    dates = scan_dates(conn, limit=2, until=scan_date)
+    if not dates:
+        return {"new": set(), "dropped": set(), "kept": set(), "previous": None}
+    today = _tickers(conn, dates[0], kind)
+    before = _tickers(conn, dates[1], kind) if len(dates) > 1 else set()
+    return {
+        "new": today - before,
+        "dropped": before - today,
+        "kept": today & before,
+        "previous": dates[1] if len(dates) > 1 else None,
+    }
+
+def persistence(conn, kind, scan_date=None, window=PERSISTENCE_WINDOW):
+    """{ticker: (streak, appearances)} for the signals of `scan_date` (default: latest).
+
+    streak = consecutive scans up to and including this one with the signal; appearances =
+    scans within the window that had it. Uses the (ticker, kind, scan_date) index per ticker.
+    """
+    dates = scan_dates(conn, limit=window, until=scan_date)
+    if not dates:
+        return {}
+    position = {d: i for i, d in enumerate(dates)}  # 0 = this scan, 1 = the one before, ...
+    result = {}
+    for ticker in _tickers(conn, dates[0], kind):
+        seen = sorted(
+            position[d] for (d,) in conn.execute(
+                "SELECT scan_date FROM signals WHERE ticker = ? AND kind = ? AND scan_date BETWEEN ? AND ?",
+                (ticker, kind, dates[-1], dates[0]),
+            ) if d in position
+        )
+        streak = 0
+        while streak < len(seen) and seen[streak] == streak:
+            streak += 1
+        result[ticker] = (streak, len(seen))
+    return result
+
+def ticker_history(conn, ticker, limit=PERSISTENCE_WINDOW):
+    """(scan_date, kind, close, adx, rsi, rr) rows for one ticker, newest first."""
+    return conn.execute(
+        "SELECT scan_date, kind, close, adx, rsi, rr FROM signals WHERE ticker = ? ORDER BY scan_date DESC LIMIT ?",
+        (ticker, limit),
+    ).fetchall()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="What changed in the stock screener since the previous scan.")
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--ticker", help="show one ticker's signal history instead")
+    args = parser.parse_args()
+
+    conn = connect(args.db)
+    if args.ticker:
+        for row in ticker_history(conn, args.ticker.upper()):
+            print(*row)
+    else:
+        latest = latest_scan_date(conn)
+        print(f"Latest scan: {latest or 'none'}")
+        for kind in ("trend", "mean_reversion"):
+            diff = diff_since_previous(conn, kind)
+            streaks = persistence(conn, kind)
+            print(f"\n{kind}: {len(diff['new'])} new, {len(diff['kept'])} kept, {len(diff['dropped'])} dropped (vs {diff['previous']})")
+            for ticker, (streak, seen) in sorted(streaks.items(), key=lambda kv: -kv[1][0]):
+                print(f"  {ticker:<10} {streak:>3} scans in a row, {seen} in window{'  NEW' if ticker in diff['new'] else ''}")
@@ -0,0 +1,59 @@
+import argparse
+import csv
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from smart_engine import score_ticker
+
+# --- HEADLESS BATCH RUNNER ---
+# Scores a whole ticker file without Streamlit, e.g. from cron:
+#   python smart_batch.py tickers.txt -o forecasts.csv --workers 8
+DEFAULT_WORKERS = 8
+
+def read_tickers(path):
+    """One ticker per line (commas also accepted); blank lines and '#' comments are skipped."""
+    tickers = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.split("#", 1)[0]
+            for t in line.replace(",", " ").split():
+                t = t.strip().upper()
+                if t:
+                    tickers.setdefault(t, None)
+    return list(tickers)
+
+def write_rows(rows, out_path):
+    if out_path.lower().endswith(".parquet"):
+        import pandas as pd
+        pd.DataFrame(rows).to_parquet(out_path, index=False)
+        return
+    with open(out_path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()))
+        writer.writeheader()
+        writer.writerows(rows)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score a list of tickers with the Smart Price Voter model.")
+    parser.add_argument("ticker_file")
+    parser.add_argument("-o", "--out", default="smart_forecasts.csv", help=".csv or .parquet")
+    parser.add_argument("-w", "--workers", type=int, default=DEFAULT_WORKERS)
+    args = parser.parse_args(argv)
+
+    tickers = read_tickers(args.ticker_file)
+    if not tickers:
+        print("❌ No tickers found.")
+        return 1
+
+    start = time.perf_counter()
+    # Scoring is network-bound (yfinance), so threads give the parallelism we need
+    with ThreadPoolExecutor(max_workers=max(1, args.workers)) as pool:
+        rows = list(pool.map(score_ticker, tickers))
+    write_rows(rows, args.out)
+
+    failed = sum(1 for r in rows if r["error"])
+    print(f"✅ Scored {len(rows) - failed}/{len(rows)} tickers in {time.perf_counter() - start:.1f}s -> {args.out}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,258 @@
+# Smart Price Voter engine shared by the CLI (SmartPriceStream.py), the Streamlit UI
+# (smart_voter_app.py) and the headless batch runner (smart_batch.py).
+# Nothing heavy is imported at module load: yfinance is only imported on the first fetch.
+import datetime
+
+import rating_store
+from smart_money import SMART_MONEY
+
+RECENT_RATINGS = 5  # Number of latest upgrades/downgrades that become individual voters
+
+class Voter:
+    """Base class for anyone 'voting' on the stock price."""
+    # Slotted (no per-instance __dict__): thousands of tickers x dozens of voters adds up fast
+    __slots__ = ("name", "credibility_score")
+
+    def __init__(self, name, credibility_score):
+        self.name = name
+        self.credibility_score = credibility_score
+
+class Analyst(Voter):
+    """Sell-Side Analyst giving a specific Price Target."""
+    __slots__ = ("firm", "price_target", "rating_date")
+
+    def __init__(self, name, firm, credibility_score, price_target, rating_date):
+        super().__init__(name, credibility_score)
+        self.firm = firm
+        self.price_target = price_target
+        self.rating_date = rating_date
+
+    def get_recency_weight(self, now=None):
+        """Decay weight if the rating is old."""
+        if not self.rating_date:
+            return 0.5 # Penalize undated generic data
+
+        days_old = ((now or datetime.datetime.now()) - self.rating_date).days
+        if days_old < 30: return 1.0
+        if days_old < 90: return 0.8
+        return 0.5
+
+class FundManager(Voter):
+    """Buy-Side Manager 'voting' with capital allocation."""
+    __slots__ = ("fund_name", "action", "conviction_level")
+
+    def __init__(self, name, fund_name, credibility_score, action, conviction_level):
+        super().__init__(name, credibility_score)
+        self.fund_name = fund_name
+        self.action = action  # "BUY", "HOLD", "SELL" (Derived from holding size/presence)
+        self.conviction_level = conviction_level
+
+def _log(verbose, message):
+    if verbose:
+        print(message)
+
+class MarketDataProvider:
+    """Fetches 'reachable' data using yfinance (Free)."""
+    @staticmethod
+    def get_real_data(ticker_symbol, verbose=False):
+        import yfinance as yf
+
+        _log(verbose, f"\n📡 Connecting to Yahoo Finance for {ticker_symbol}...")
+        stock = yf.Ticker(ticker_symbol)
+
+        # 1. Fetch Analyst Consensus & Targets
+        try:
+            info = stock.info
+            current_price = info.get('currentPrice', 0.0)
+            target_mean = info.get('targetMeanPrice', 0.0)
+            target_high = info.get('targetHighPrice', 0.0)
+            target_low = info.get('targetLowPrice', 0.0)
+            num_analysts = info.get('numberOfAnalystOpinions', 0)
+            _log(verbose, f"   -> Price: ${current_price} | Consensus: ${target_mean} ({num_analysts} analysts)")
+        except Exception as e:
+            _log(verbose, f"   ⚠️ Error fetching basic info: {e}")
+            return None
+
+        # 2. Fetch Institutional Holders (The 'Smart Money' Vote)
+        holders_data = []
+        try:
+            # yfinance returns a DataFrame for institutional_holders
+            # Columns usually: ['Holder', 'Shares', 'Date Reported', '% Out', 'Value']
+            inst_holders = stock.institutional_holders
+            if inst_holders is not None and not inst_holders.empty:
+                for index, row in inst_holders.iterrows():
+                    holders_data.append({
+                        "Holder": row.get('Holder', 'Unknown'),
+                        "Pct_Held": row.get('% Out', 0),
+                        "Shares": row.get('Shares', 0)
+                    })
+                _log(verbose, f"   -> Found {len(holders_data)} major institutional holders.")
+            else:
+                _log(verbose, "   -> No institutional holder data available.")
+        except Exception as e:
+            _log(verbose, f"   ⚠️ Error fetching holders: {e}")
+
+        # 3. Fetch Recent Upgrades/Downgrades (Analyst Actions)
+        recent_ratings = []
+        try:
+            upgrades = stock.upgrades_downgrades
+            if upgrades is not None and not upgrades.empty:
+                # Keep the full history locally for the firm-accuracy job
+                rating_store.record_upgrades(ticker_symbol, upgrades)
+                latest = upgrades.tail(RECENT_RATINGS)
+                for index, row in latest.iterrows():
+                    recent_ratings.append({
+                        "Firm": row.get('Firm', 'Unknown'),
+                        "Action": row.get('Action', 'Unknown'),
+                        "ToGrade": row.get('ToGrade', 'Unknown'),
+                        "Date": index
+                    })
+                _log(verbose, f"   -> Found recent analyst actions from: {', '.join([str(r['Firm']) for r in recent_ratings])}")
+        except Exception as e:
+            _log(verbose, f"   ⚠️ Error fetching upgrades: {e}")
+
+        return {
+            "current_price": current_price,
+            "targets": {"mean": target_mean, "high": target_high, "low": target_low, "count": num_analysts},
+            "holders": holders_data,
+            "ratings": recent_ratings
+        }
+
+class SmartPriceEngine:
+    def __init__(self, ticker, verbose=False):
+        self.ticker = ticker
+        self.verbose = verbose
+        self.current_price = 0.0
+        self.analysts = []
+        self.funds = []
+        self.raw_data = None
+
+    def load_data(self):
+        self.raw_data = MarketDataProvider.get_real_data(self.ticker, verbose=self.verbose)
+        if not self.raw_data or not self.raw_data['current_price']:
+            return False
+
+        self.current_price = self.raw_data["current_price"]
+        targets = self.raw_data["targets"]
+        now = datetime.datetime.now()
+
+        # --- 1. BUILD ANALYST VOTERS ---
+        # We create "Composite Analysts" based on the High/Low/Mean data
+        if targets["mean"] and targets["mean"] > 0:
+            self.analysts.append(Analyst("Street Consensus", "Avg", 0.5, targets["mean"], now))
+        if targets["high"] and targets["high"] > 0:
+            self.analysts.append(Analyst("Street High", "Optimistic", 0.7, targets["high"], now))
+        if targets["low"] and targets["low"] > 0:
+            self.analysts.append(Analyst("Street Low", "Pessimistic", 0.7, targets["low"], now))
+
+        # Add specific recent ratings
+        for r in self.raw_data["ratings"]:
+            # Estimate target based on grade (yfinance doesn't give the exact target in this DF)
+            # Buy = +15%, Hold = 0%, Sell = -15% relative to current price
+            est_target = self.current_price
+            credibility = 0.6
+            grade = str(r["ToGrade"]).lower()
+            if "buy" in grade or "outperform" in grade or "overweight" in grade:
+                est_target = self.current_price * 1.15
+                credibility = 0.8
+            elif "sell" in grade or "underperform" in grade:
+                est_target = self.current_price * 0.85
+                credibility = 0.8
+
+            # Firms with a scored track record use their realized hit rate instead
+            credibility = rating_store.firm_credibility(r['Firm'], credibility)
+
+            # Convert Pandas Timestamp to python datetime if needed
+            rating_date = r['Date'].to_pydatetime() if hasattr(r['Date'], 'to_pydatetime') else r['Date']
+            if isinstance(rating_date, datetime.datetime) and rating_date.tzinfo is not None:
+                rating_date = rating_date.replace(tzinfo=None)
+            self.analysts.append(Analyst(r['Firm'], "Recent Rating", credibility, est_target, rating_date))
+
+        # --- 2. BUILD FUND MANAGER VOTERS ---
+        # We match the real holders against our "Smart Money Watchlist"
+        for holder in self.raw_data["holders"]:
+            holder_name = holder["Holder"]
+            matched = SMART_MONEY.classify(holder_name)
+            if matched:
+                name, score = matched
+                # Presence in the Top 10 is treated as a high conviction "BUY/HOLD" vote
+                self.funds.append(FundManager(holder_name, name, score, "BUY", 0.8))
+            else:
+                # Generic Top Holder (lower credibility but still huge money)
+                self.funds.append(FundManager(holder_name, "Institutional", 0.4, "BUY", 0.5))
+        return True
+
+    def calculate(self):
+        # --- ANALYST CALCULATION ---
+        total_weight = 0
+        weighted_sum = 0
+        analyst_details = []
+        now = datetime.datetime.now()
+
+        for a in self.analysts:
+            w = a.credibility_score * a.get_recency_weight(now)
+            total_weight += w
+            weighted_sum += (a.price_target * w)
+            analyst_details.append({
+                "Source": f"{a.name} ({a.firm})",
+                "Target": f"${a.price_target:.2f}",
+                "Weight": f"{w:.2f}"
+            })
+
+        base_price = weighted_sum / total_weight if total_weight > 0 else self.current_price
+
+        # --- FUND MANAGER CALCULATION ---
+        bullish_power = 0
+        fund_details = []
+        if not self.funds:
+            sentiment_mod = 1.0
+        else:
+            for f in self.funds:
+                # Presence in top holders is generally bullish
+                power = f.credibility_score * f.conviction_level
+                bullish_power += power
+                fund_details.append({
+                    "Fund": f"{f.name}",
+                    "Type": f"{f.fund_name}",
+                    "Impact": f"{power:.2f}"
+                })
+
+            # Average conviction, mapped to a 0.90x (Dampener) .. 1.10x (Booster) modifier
+            raw_sentiment = bullish_power / len(self.funds)
+            sentiment_mod = 0.90 + (raw_sentiment * 0.20)
+
+        final_price = base_price * sentiment_mod
+
+        return {
+            "base_price": base_price,
+            "final_price": final_price,
+            "sentiment_mod": sentiment_mod,
+            "analyst_details": analyst_details,
+            "fund_details": fund_details,
+            "raw_targets": self.raw_data["targets"]
+        }
+
+def score_ticker(ticker):
+    """Runs the full model for one ticker and returns a flat result row (for batch output)."""
+    row = {"ticker": ticker, "current_price": None, "base_price": None, "final_price": None,
+           "sentiment_mod": None, "upside_pct": None, "analyst_votes": 0, "fund_votes": 0, "error": ""}
+    try:
+        engine = SmartPriceEngine(ticker)
+        if not engine.load_data():
+            row["error"] = "no data"
+            return row
+        result = engine.calculate()
+    except Exception as e:
+        row["error"] = str(e)
+        return row
+
+    row.update({
+        "current_price": round(engine.current_price, 4),
+        "base_price": round(result["base_price"], 4),
+        "final_price": round(result["final_price"], 4),
+        "sentiment_mod": round(result["sentiment_mod"], 4),
+        "upside_pct": round((result["final_price"] / engine.current_price - 1) * 100, 2),
+        "analyst_votes": len(result["analyst_details"]),
+        "fund_votes": len(result["fund_details"]),
+    })
+    return row
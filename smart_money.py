@@ -0,0 +1,132 @@
+import csv
+import json
+import os
+import re
+from collections import deque
+from functools import lru_cache
+
+# --- CONFIGURATION ---
+# Famous "Smart Money" funds we look for in the Top Holders list
+SMART_MONEY_WATCHLIST = {
+    "Vanguard Group": 0.85,        # High credibility for stability
+    "Blackrock": 0.80,             # High credibility for flow
+    "Berkshire Hathaway": 0.99,    # The Oracle (Highest)
+    "State Street": 0.75,
+    "Morgan Stanley": 0.70,
+    "Goldman Sachs": 0.70,
+    "Tiger Global": 0.90,          # Tech Specialist
+    "Appaloosa": 0.95,             # Tepper
+    "Duquesne": 0.95,              # Druckenmiller
+    "Geode Capital": 0.65,
+}
+
+# Optional external watchlist (e.g. thousands of 13F filers), merged on top of the defaults
+WATCHLIST_FILE_ENV = "SMART_MONEY_WATCHLIST_FILE"
+CLASSIFY_CACHE_SIZE = 200_000
+
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+
+def normalize_name(name):
+    """Lowercases a fund/holder name and collapses punctuation into single spaces."""
+    return _NON_ALNUM.sub(" ", str(name).lower()).strip()
+
+def load_watchlist(path):
+    """Loads a watchlist from a JSON dict or a CSV with 'name,score' columns."""
+    if path.lower().endswith(".json"):
+        with open(path, "r", encoding="utf-8") as f:
+            return {str(k): float(v) for k, v in json.load(f).items()}
+
+    watchlist = {}
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        for row in csv.reader(f):
+            if len(row) < 2 or not row[0].strip():
+                continue
+            try:
+                watchlist[row[0].strip()] = float(row[1])
+            except ValueError:
+                continue  # header or malformed row
+    return watchlist
+
+class SmartMoneyClassifier:
+    """Matches holder names against a watchlist with one Aho-Corasick pass per name.
+
+    A holder matches a fund when the fund's normalized name appears anywhere inside the
+    holder's normalized name. If several funds match, the one listed first in the
+    watchlist wins (same rule as the old nested loop).
+    """
+    def __init__(self, watchlist):
+        self.entries = []  # (fund_name, score) in watchlist order
+        self._goto = [{}]
+        self._fail = [0]
+        self._best = [None]  # lowest watchlist index ending at (or via fail links, below) each node
+
+        for fund_name, score in watchlist.items():
+            key = normalize_name(fund_name)
+            if not key:
+                continue
+            self._add(key, len(self.entries))
+            self.entries.append((fund_name, score))
+        self._build_links()
+        self.classify = lru_cache(maxsize=CLASSIFY_CACHE_SIZE)(self._classify)
+
+    def _add(self, key, index):
+        node = 0
+        for ch in key:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._best.append(None)
+            node = nxt
+        if self._best[node] is None:
+            self._best[node] = index
+
+    def _build_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(ch, 0)
+                self._fail[child] = target if target != child else 0
+                inherited = self._best[self._fail[child]]
+                if inherited is not None and (self._best[child] is None or inherited < self._best[child]):
+                    self._best[child] = inherited
+
+    def _classify(self, holder_name):
+        goto, fail, best_at = self._goto, self._fail, self._best
+        node = 0
+        best = None
+        for ch in normalize_name(holder_name):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            hit = best_at[node]
+            if hit is not None and (best is None or hit < best):
+                best = hit
+                if best == 0:
+                    break
+        return self.entries[best] if best is not None else None
+
+    def classify_many(self, holder_names):
+        """Classifies a bulk iterable of holder names; repeated names hit the memo cache."""
+        classify = self.classify
+        return [classify(name) for name in holder_names]
+
+    def __len__(self):
+        return len(self.entries)
+
+def build_default_classifier():
+    """Builds the startup classifier from the defaults plus the optional external file."""
+    watchlist = dict(SMART_MONEY_WATCHLIST)
+    path = os.environ.get(WATCHLIST_FILE_ENV)
+    if path and os.path.exists(path):
+        watchlist.update(load_watchlist(path))
+    return SmartMoneyClassifier(watchlist)
+
+SMART_MONEY = build_default_classifier()
@@ -0,0 +1,509 @@
+import datetime
+import re
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+import stash_images
+
+# -----------------------
+# 1BOX data-access layer
+# -----------------------
+# Queries are column-projected: listing/placement never touches image data, thumbnails
+# are fetched only for the rows on screen, and originals only when a detail view opens.
+DB_PATH = "1box.db"
+PAGE_SIZE = 20
+DEFAULT_BOX = 1
+
+META_COLUMNS = "id, title, remark, location, grid_row, grid_col, created_at, image_hash, box_id"
+
+BUSY_TIMEOUT_MS = 5000  # writers wait this long for the lock instead of failing with "database is locked"
+MIGRATE_BATCH = 50
+
+# Near-duplicate photos: dHash distance in bits (out of 64)
+DUPLICATE_DISTANCE = 4  # "you probably already stored this"
+SIMILAR_DISTANCE = 7    # "find similar items"; the 8-band index finds every match up to 7 bits
+HASH_BANDS = 8          # 8 x 8-bit bands: two hashes <= 7 bits apart agree exactly on at least one band
+
+class SlotOccupied(Exception):
+    """Raised when a specific slot is requested but another item already holds it."""
+
+def connect(path=DB_PATH):
+    """Opens one connection tuned for many Streamlit sessions sharing the file.
+
+    WAL lets readers keep reading while someone uploads; autocommit mode (isolation_level=None)
+    means nothing is held open between statements and multi-step writes use transaction().
+    """
+    conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT_MS / 1000, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+    return conn
+
+@contextmanager
+def transaction(conn):
+    """BEGIN IMMEDIATE ... COMMIT: takes the write lock up front so two saves can't race."""
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
+
+class StashDB:
+    """Process-wide handle that gives every thread its own connection to the same file.
+
+    Streamlit runs each session (and each rerun) on its own thread; sqlite3 connections must
+    not be shared across threads, so we cache one per thread instead of one global connection.
+    """
+    def __init__(self, path=DB_PATH, default_rows=6, default_cols=4):
+        self.path = path
+        self._local = threading.local()
+        conn = self.connection()
+        init_schema(conn, default_rows, default_cols)
+        migrate_image_blobs(conn)
+        backfill_photo_hashes(conn)
+
+    def connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = connect(self.path)
+        return conn
+
+def init_db(path=DB_PATH, default_rows=6, default_cols=4):
+    """Single connection with the schema ready (scripts and one-off tools)."""
+    conn = connect(path)
+    init_schema(conn, default_rows, default_cols)
+    migrate_image_blobs(conn)
+    backfill_photo_hashes(conn)
+    return conn
+
+def init_schema(conn, default_rows=6, default_cols=4):
+    # one transaction, so two processes starting at once can't both run the ALTERs
+    with transaction(conn):
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS items (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                title TEXT,
+                remark TEXT,
+                location TEXT,
+                image BLOB,
+                grid_row INTEGER,
+                grid_col INTEGER,
+                created_at TEXT
+            )
+            """
+        )
+        # originals moved out of SQLite: keep the content hash + a small thumbnail instead
+        existing = {row[1] for row in conn.execute("PRAGMA table_info(items)")}
+        if "image_hash" not in existing:
+            conn.execute("ALTER TABLE items ADD COLUMN image_hash TEXT")
+        if "thumb" not in existing:
+            conn.execute("ALTER TABLE items ADD COLUMN thumb BLOB")
+        if "box_id" not in existing:
+            conn.execute(f"ALTER TABLE items ADD COLUMN box_id INTEGER NOT NULL DEFAULT {DEFAULT_BOX}")
+        if "phash" not in existing:
+            conn.execute("ALTER TABLE items ADD COLUMN phash INTEGER")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_items_image_hash ON items (image_hash)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_items_phash ON items (phash)")
+
+        # Slot allocation: every box hands out slots 0..rows*cols-1 (row-major). Slots >= next_fresh
+        # have never been used; released holes below it sit in free_slots, so "next free" is a
+        # MIN() on a B-tree instead of a scan over the whole grid.
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS boxes (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT UNIQUE NOT NULL,
+                grid_rows INTEGER NOT NULL,
+                grid_cols INTEGER NOT NULL,
+                next_fresh INTEGER NOT NULL DEFAULT 0
+            )
+            """
+        )
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS free_slots (
+                box_id INTEGER NOT NULL,
+                slot INTEGER NOT NULL,
+                PRIMARY KEY (box_id, slot)
+            ) WITHOUT ROWID
+            """
+        )
+        if not conn.execute("SELECT 1 FROM boxes WHERE id = ?", (DEFAULT_BOX,)).fetchone():
+            conn.execute(
+                "INSERT INTO boxes (id, name, grid_rows, grid_cols) VALUES (?, ?, ?, ?)",
+                (DEFAULT_BOX, "Main stash", default_rows, default_cols),
+            )
+            _dedupe_legacy_slots(conn)
+            _rebuild_free_slots(conn, DEFAULT_BOX)
+        conn.execute("DROP INDEX IF EXISTS idx_items_slot")
+        conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_items_box_slot ON items (box_id, grid_row, grid_col)")
+        _init_search_index(conn)
+        _init_photo_hash_index(conn)
+
+def _init_search_index(conn):
+    """FTS5 index over title/remark/location, kept in sync by triggers (skipped if FTS5 is missing)."""
+    if conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'items_fts'").fetchone():
+        return
+    try:
+        conn.execute(
+            "CREATE VIRTUAL TABLE items_fts USING fts5("
+            "title, remark, location, content='items', content_rowid='id', "
+            "tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+        )
+    except sqlite3.OperationalError:
+        return  # this SQLite build has no FTS5; search_items() falls back to LIKE
+    for trigger in (
+        "CREATE TRIGGER IF NOT EXISTS items_fts_ai AFTER INSERT ON items BEGIN "
+        "INSERT INTO items_fts (rowid, title, remark, location) VALUES (new.id, new.title, new.remark, new.location); END",
+        "CREATE TRIGGER IF NOT EXISTS items_fts_ad AFTER DELETE ON items BEGIN "
+        "INSERT INTO items_fts (items_fts, rowid, title, remark, location) VALUES ('delete', old.id, old.title, old.remark, old.location); END",
+        "CREATE TRIGGER IF NOT EXISTS items_fts_au AFTER UPDATE OF title, remark, location ON items BEGIN "
+        "INSERT INTO items_fts (items_fts, rowid, title, remark, location) VALUES ('delete', old.id, old.title, old.remark, old.location); "
+        "INSERT INTO items_fts (rowid, title, remark, location) VALUES (new.id, new.title, new.remark, new.location); END",
+    ):
+        conn.execute(trigger)
+    conn.execute("INSERT INTO items_fts (items_fts) VALUES ('rebuild')")  # index rows saved before FTS existed
+
+def _band_values(expr):
+    return [f"({expr} >> {8 * b}) & 255" for b in range(HASH_BANDS)]
+
+def _init_photo_hash_index(conn):
+    """Multi-index Hamming search: each 64-bit dHash is split into 8 one-byte bands.
+
+    Any hash within 7 bits of a query shares at least one band with it exactly, so a lookup is
+    8 index probes plus a popcount on the few candidates - no image is ever decoded.
+    """
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS item_hash_bands (
+            band INTEGER NOT NULL,
+            value INTEGER NOT NULL,
+            item_id INTEGER NOT NULL,
+            PRIMARY KEY (band, value, item_id)
+        ) WITHOUT ROWID
+        """
+    )
+    insert_bands = "INSERT INTO item_hash_bands (band, value, item_id) " + " UNION ALL ".join(
+        f"SELECT {b}, {v}, new.id WHERE new.phash IS NOT NULL" for b, v in enumerate(_band_values("new.phash"))
+    )
+    for trigger in (
+        f"CREATE TRIGGER IF NOT EXISTS items_phash_ai AFTER INSERT ON items BEGIN {insert_bands}; END",
+        "CREATE TRIGGER IF NOT EXISTS items_phash_ad AFTER DELETE ON items BEGIN "
+        "DELETE FROM item_hash_bands WHERE item_id = old.id; END",
+        "CREATE TRIGGER IF NOT EXISTS items_phash_au AFTER UPDATE OF phash ON items BEGIN "
+        f"DELETE FROM item_hash_bands WHERE item_id = old.id; {insert_bands}; END",
+    ):
+        conn.execute(trigger)
+
+def _dedupe_legacy_slots(conn):
+    """Older databases could hold two items in one cell; keep the oldest, unplace the rest."""
+    conn.execute(
+        """
+        UPDATE items SET grid_row = NULL, grid_col = NULL
+        WHERE grid_row IS NOT NULL AND id NOT IN (
+            SELECT MIN(id) FROM items WHERE grid_row IS NOT NULL GROUP BY box_id, grid_row, grid_col
+        )
+        """
+    )
+
+def rebuild_free_slots(conn, box_id):
+    """Recomputes next_fresh and the free holes of a box from the items table (repair tool)."""
+    with transaction(conn):
+        _rebuild_free_slots(conn, box_id)
+
+def _rebuild_free_slots(conn, box_id):
+    rows, cols = conn.execute("SELECT grid_rows, grid_cols FROM boxes WHERE id = ?", (box_id,)).fetchone()
+    used = {
+        (r - 1) * cols + (c - 1)
+        for r, c in conn.execute(
+            "SELECT grid_row, grid_col FROM items WHERE box_id = ? AND grid_row BETWEEN 1 AND ? AND grid_col BETWEEN 1 AND ?",
+            (box_id, rows, cols),
+        )
+    }
+    next_fresh = max(used) + 1 if used else 0
+    conn.execute("DELETE FROM free_slots WHERE box_id = ?", (box_id,))
+    conn.executemany(
+        "INSERT INTO free_slots (box_id, slot) VALUES (?, ?)",
+        [(box_id, slot) for slot in range(next_fresh) if slot not in used],
+    )
+    conn.execute("UPDATE boxes SET next_fresh = ? WHERE id = ?", (next_fresh, box_id))
+
+def migrate_image_blobs(conn):
+    """One-time move of legacy full-size BLOBs to the file store (+ thumbnail), in batches."""
+    legacy_ids = [r[0] for r in conn.execute("SELECT id FROM items WHERE image IS NOT NULL AND image_hash IS NULL")]
+    for start in range(0, len(legacy_ids), MIGRATE_BATCH):
+        with transaction(conn):
+            for item_id in legacy_ids[start:start + MIGRATE_BATCH]:
+                found = conn.execute("SELECT image FROM items WHERE id = ? AND image_hash IS NULL", (item_id,)).fetchone()
+                if not found or found[0] is None:
+                    continue  # another process migrated it meanwhile
+                digest = stash_images.store_original(found[0])
+                thumb, phash = stash_images.process_photo(found[0])
+                conn.execute(
+                    "UPDATE items SET image_hash = ?, thumb = ?, phash = ?, image = NULL WHERE id = ?",
+                    (digest, thumb, phash, item_id),
+                )
+
+def backfill_photo_hashes(conn):
+    """One-time dHash for items saved before hashing existed, computed from the stored thumbnail."""
+    pending = [r[0] for r in conn.execute("SELECT id FROM items WHERE phash IS NULL AND thumb IS NOT NULL")]
+    for start in range(0, len(pending), MIGRATE_BATCH):
+        with transaction(conn):
+            for item_id in pending[start:start + MIGRATE_BATCH]:
+                found = conn.execute("SELECT thumb FROM items WHERE id = ? AND phash IS NULL", (item_id,)).fetchone()
+                if not found or found[0] is None:
+                    continue
+                try:
+                    phash = stash_images.dhash_bytes(found[0])
+                except OSError:
+                    continue  # unreadable thumbnail: leave it out of similarity search
+                conn.execute("UPDATE items SET phash = ? WHERE id = ?", (phash, item_id))
+
+# -----------------------
+# Boxes & slot allocation (the _helpers run inside transaction())
+# -----------------------
+def list_boxes(conn):
+    return conn.execute("SELECT id, name, grid_rows, grid_cols FROM boxes ORDER BY id").fetchall()
+
+def create_box(conn, name, rows, cols):
+    with transaction(conn):
+        cur = conn.execute("INSERT INTO boxes (name, grid_rows, grid_cols) VALUES (?, ?, ?)", (name, rows, cols))
+        return cur.lastrowid
+
+def _box_shape(conn, box_id):
+    return conn.execute("SELECT grid_rows, grid_cols, next_fresh FROM boxes WHERE id = ?", (box_id,)).fetchone()
+
+def _slot_taken(conn, box_id, slot, cols):
+    return conn.execute(
+        "SELECT 1 FROM items WHERE box_id = ? AND grid_row = ? AND grid_col = ?", (box_id, slot // cols + 1, slot % cols + 1)
+    ).fetchone() is not None
+
+def _allocate_slot(conn, box_id):
+    """Lowest free slot of the box as (row, col), or (None, None) when the box is full.
+
+    Released holes come from the free_slots B-tree; otherwise we advance the high-water mark,
+    skipping cells that were hand-picked ahead of it (each cell is skipped at most once).
+    """
+    rows, cols, next_fresh = _box_shape(conn, box_id)
+    (slot,) = conn.execute("SELECT MIN(slot) FROM free_slots WHERE box_id = ?", (box_id,)).fetchone()
+    if slot is not None:
+        conn.execute("DELETE FROM free_slots WHERE box_id = ? AND slot = ?", (box_id, slot))
+        return slot // cols + 1, slot % cols + 1
+
+    slot = next_fresh
+    while slot < rows * cols and _slot_taken(conn, box_id, slot, cols):
+        slot += 1
+    if slot >= rows * cols:
+        conn.execute("UPDATE boxes SET next_fresh = ? WHERE id = ?", (slot, box_id))
+        return None, None
+    conn.execute("UPDATE boxes SET next_fresh = ? WHERE id = ?", (slot + 1, box_id))
+    return slot // cols + 1, slot % cols + 1
+
+def _claim_slot(conn, box_id, row, col):
+    """Reserves a specific (row, col); raises SlotOccupied if it is taken."""
+    rows, cols, next_fresh = _box_shape(conn, box_id)
+    if not (1 <= row <= rows and 1 <= col <= cols):
+        raise SlotOccupied(f"({row},{col}) is outside this box")
+    slot = (row - 1) * cols + (col - 1)
+    if slot < next_fresh:
+        taken = conn.execute("DELETE FROM free_slots WHERE box_id = ? AND slot = ?", (box_id, slot)).rowcount == 0
+    else:
+        # ahead of the high-water mark: free unless someone hand-picked it already
+        taken = _slot_taken(conn, box_id, slot, cols)
+    if taken:
+        raise SlotOccupied(f"({row},{col}) is already occupied")
+    return row, col
+
+def _release_slot(conn, box_id, row, col):
+    if row is None or col is None:
+        return
+    rows, cols, next_fresh = _box_shape(conn, box_id)
+    slot = (row - 1) * cols + (col - 1)
+    # cells at or past the high-water mark are implicitly free again once the item leaves
+    if 1 <= row <= rows and 1 <= col <= cols and slot < next_fresh:
+        conn.execute("INSERT OR IGNORE INTO free_slots (box_id, slot) VALUES (?, ?)", (box_id, slot))
+
+def _reserve(conn, box_id, row, col, auto_place):
+    if row is not None and col is not None:
+        return _claim_slot(conn, box_id, int(row), int(col))
+    if auto_place:
+        return _allocate_slot(conn, box_id)
+    return None, None
+
+# -----------------------
+# Writes
+# -----------------------
+def save_item(conn, title, remark, location, image_bytes, row=None, col=None, auto_place=False, box_id=DEFAULT_BOX, created_at=None):
+    """Saves an item and reserves its slot atomically. Returns (item_id, row, col)."""
+    now = created_at or datetime.datetime.now().isoformat()
+    # decode once at save time; every later render uses the thumbnail
+    thumb, phash = stash_images.process_photo(image_bytes)
+    digest = stash_images.image_digest(image_bytes)
+    with transaction(conn):
+        row, col = _reserve(conn, box_id, row, col, auto_place)
+        cur = conn.execute(
+            "INSERT INTO items (title, remark, location, image_hash, thumb, phash, grid_row, grid_col, created_at, box_id) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (title, remark, location, digest, thumb, phash, row, col, now, box_id),
+        )
+        # the file is written only once the slot is ours (no orphan on SlotOccupied) and under
+        # the write lock, so a concurrent delete of the same photo can't remove it underneath us
+        stash_images.store_original(image_bytes)
+    return cur.lastrowid, row, col
+
+def delete_item(conn, item_id):
+    with transaction(conn):
+        found = conn.execute("SELECT image_hash, box_id, grid_row, grid_col FROM items WHERE id = ?", (item_id,)).fetchone()
+        if found is None:
+            return
+        image_hash, box_id, row, col = found
+        conn.execute("DELETE FROM items WHERE id = ?", (item_id,))
+        _release_slot(conn, box_id, row, col)
+        # originals are shared by identical photos, so only drop the file when nobody references
+        # it; checked and removed under the write lock so a save of the same photo can't interleave
+        if image_hash:
+            still_used = conn.execute("SELECT 1 FROM items WHERE image_hash = ? LIMIT 1", (image_hash,)).fetchone()
+            if not still_used:
+                stash_images.remove_original(image_hash)
+
+def place_item(conn, item_id, row=None, col=None, box_id=None):
+    """Moves an item to (row, col), or to the box's next free slot when no cell is given.
+
+    Returns the new (row, col); raises SlotOccupied if the requested cell is taken.
+    """
+    with transaction(conn):
+        old_box, old_row, old_col = conn.execute(
+            "SELECT box_id, grid_row, grid_col FROM items WHERE id = ?", (item_id,)
+        ).fetchone()
+        box_id = old_box if box_id is None else box_id
+        if row is not None and col is not None and (box_id, row, col) == (old_box, old_row, old_col):
+            return row, col
+        _release_slot(conn, old_box, old_row, old_col)
+        new_row, new_col = _reserve(conn, box_id, row, col, auto_place=True)
+        conn.execute(
+            "UPDATE items SET box_id = ?, grid_row = ?, grid_col = ? WHERE id = ?", (box_id, new_row, new_col, item_id)
+        )
+    return new_row, new_col
+
+# -----------------------
+# Reads (metadata only unless the name says otherwise)
+# -----------------------
+def count_items(conn):
+    return conn.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+
+def slot_owner(conn, row, col, box_id=DEFAULT_BOX):
+    found = conn.execute(
+        "SELECT id FROM items WHERE box_id = ? AND grid_row = ? AND grid_col = ?", (box_id, row, col)
+    ).fetchone()
+    return found[0] if found else None
+
+def load_grid_cells(conn, box_id, first_row, last_row, cols):
+    """(id, title, thumb, row, col) for items placed in the visible rows of a box."""
+    return conn.execute(
+        "SELECT id, title, thumb, grid_row, grid_col FROM items "
+        "WHERE box_id = ? AND grid_row BETWEEN ? AND ? AND grid_col BETWEEN 1 AND ?",
+        (box_id, first_row, last_row, cols),
+    ).fetchall()
+
+def load_items_page(conn, before_id=None, limit=PAGE_SIZE):
+    """Newest-first page of metadata rows using keyset pagination (WHERE id < last seen id)."""
+    if before_id is None:
+        return conn.execute(f"SELECT {META_COLUMNS} FROM items ORDER BY id DESC LIMIT ?", (limit,)).fetchall()
+    return conn.execute(
+        f"SELECT {META_COLUMNS} FROM items WHERE id < ? ORDER BY id DESC LIMIT ?", (before_id, limit)
+    ).fetchall()
+
+def _search_terms(query):
+    return re.findall(r"\w+", query.lower())[:8]
+
+def search_items(conn, query, limit=PAGE_SIZE):
+    """Best-matching metadata rows for a search box query.
+
+    Every word must match (as a prefix, so "scr" finds "screwdriver"); results are ranked by
+    BM25 with title hits weighted above location and remark hits.
+    """
+    terms = _search_terms(query)
+    if not terms:
+        return []
+    prefixed = ", ".join(f"i.{c.strip()}" for c in META_COLUMNS.split(","))
+    if conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'items_fts'").fetchone():
+        match = " ".join(f'"{t}"*' for t in terms)
+        return conn.execute(
+            f"SELECT {prefixed} FROM items_fts JOIN items i ON i.id = items_fts.rowid "
+            "WHERE items_fts MATCH ? ORDER BY bm25(items_fts, 10.0, 2.0, 4.0) LIMIT ?",
+            (match, limit),
+        ).fetchall()
+
+    # no FTS5 in this SQLite build: substring scan, newest first
+    where = " AND ".join(["(i.title LIKE ? OR i.remark LIKE ? OR i.location LIKE ?)"] * len(terms))
+    params = [f"%{t}%" for t in terms for _ in range(3)]
+    return conn.execute(
+        f"SELECT {prefixed} FROM items i WHERE {where} ORDER BY i.id DESC LIMIT ?", (*params, limit)
+    ).fetchall()
+
+def find_similar(conn, phash, max_distance=SIMILAR_DISTANCE, exclude_id=None, limit=PAGE_SIZE):
+    """[(distance, metadata row)] for items whose photo is within max_distance bits, closest first.
+
+    Recall is exact up to SIMILAR_DISTANCE (7); larger distances may miss some matches.
+    """
+    if phash is None:
+        return []
+    probes = " OR ".join(["(band = ? AND value = ?)"] * HASH_BANDS)
+    params = [x for b in range(HASH_BANDS) for x in (b, (phash >> (8 * b)) & 255)]
+    prefixed = ", ".join(f"i.{c.strip()}" for c in META_COLUMNS.split(","))
+    rows = conn.execute(
+        f"SELECT {prefixed}, i.phash FROM items i WHERE i.id IN "
+        f"(SELECT item_id FROM item_hash_bands WHERE {probes})",
+        params,
+    ).fetchall()
+    matches = []
+    for row in rows:
+        if row[0] == exclude_id:
+            continue
+        distance = stash_images.hamming(phash, row[-1])
+        if distance <= max_distance:
+            matches.append((distance, row[:-1]))
+    matches.sort(key=lambda m: (m[0], -m[1][0]))
+    return matches[:limit]
+
+def find_similar_items(conn, item_id, max_distance=SIMILAR_DISTANCE, limit=PAGE_SIZE):
+    """Items that look like `item_id`'s photo (the item itself excluded)."""
+    found = conn.execute("SELECT phash FROM items WHERE id = ?", (item_id,)).fetchone()
+    if not found:
+        return []
+    return find_similar(conn, found[0], max_distance, exclude_id=item_id, limit=limit)
+
+def count_floating_items(conn):
+    return conn.execute("SELECT COUNT(*) FROM items WHERE grid_row IS NULL OR grid_col IS NULL").fetchone()[0]
+
+def load_floating_items(conn, after_id=None, limit=PAGE_SIZE):
+    """Oldest-first page of items without a grid slot, keyset-paginated (WHERE id > last seen id)."""
+    return conn.execute(
+        f"SELECT {META_COLUMNS} FROM items WHERE (grid_row IS NULL OR grid_col IS NULL) AND id > ? ORDER BY id LIMIT ?",
+        (after_id or 0, limit),
+    ).fetchall()
+
+def load_thumbs(conn, item_ids):
+    """{id: thumbnail bytes} for just the given ids (one query per page)."""
+    item_ids = list(item_ids)
+    if not item_ids:
+        return {}
+    marks = ",".join("?" * len(item_ids))
+    return dict(conn.execute(f"SELECT id, thumb FROM items WHERE id IN ({marks})", item_ids))
+
+def load_original_image(conn, item_id):
+    found = conn.execute("SELECT image_hash FROM items WHERE id = ?", (item_id,)).fetchone()
+    return stash_images.load_original(found[0]) if found else None
+
+def iter_all_items(conn, chunk_size=PAGE_SIZE):
+    """Streams metadata rows in id order with a cursor, chunk by chunk."""
+    cur = conn.execute(f"SELECT {META_COLUMNS} FROM items ORDER BY id")
+    while True:
+        chunk = cur.fetchmany(chunk_size)
+        if not chunk:
+            break
+        yield from chunk
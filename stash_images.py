@@ -0,0 +1,111 @@
+import hashlib
+import io
+import os
+import tempfile
+
+from PIL import Image, ImageOps
+
+# -----------------------
+# Image store for 1BOX
+# -----------------------
+# Originals live on disk, content-addressed by SHA-256 (identical photos are stored once).
+# SQLite only keeps the hash plus a small thumbnail that the grid and list render.
+IMAGE_DIR = "1box_images"
+THUMB_SIZE = (192, 192)
+THUMB_QUALITY = 70
+
+def original_path(digest, image_dir=IMAGE_DIR):
+    return os.path.join(image_dir, digest[:2], digest)
+
+def image_digest(image_bytes):
+    return hashlib.sha256(image_bytes).hexdigest()
+
+def store_original(image_bytes, image_dir=IMAGE_DIR):
+    """Writes the original photo once under its SHA-256 and returns the digest."""
+    digest = image_digest(image_bytes)
+    path = original_path(digest, image_dir)
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # unique temp name per call: sessions are threads of one process, so a pid isn't enough
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(image_bytes)
+            os.replace(tmp, path)  # atomic: readers never see a half-written file
+        except OSError:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            if not os.path.exists(path):  # someone else storing the same photo is just as good
+                raise
+    return digest
+
+def load_original(digest, image_dir=IMAGE_DIR):
+    if not digest:
+        return None
+    try:
+        with open(original_path(digest, image_dir), "rb") as f:
+            return f.read()
+    except OSError:
+        return None
+
+def remove_original(digest, image_dir=IMAGE_DIR):
+    try:
+        os.remove(original_path(digest, image_dir))
+    except OSError:
+        pass
+
+# what Pillow raises for files that are not (valid) images
+IMAGE_ERRORS = (OSError, ValueError, SyntaxError, Image.DecompressionBombError)
+
+def process_photo(image_bytes):
+    """Single decode at save time -> (thumbnail bytes, 64-bit perceptual hash).
+
+    The thumbnail is a small WebP (JPEG if Pillow lacks WebP).
+    """
+    img = Image.open(io.BytesIO(image_bytes))
+    img = ImageOps.exif_transpose(img)  # phone photos are often stored rotated
+    img.thumbnail(THUMB_SIZE)
+    if img.mode not in ("RGB", "RGBA"):
+        img = img.convert("RGBA" if "transparency" in img.info or img.mode in ("LA", "PA") else "RGB")
+
+    out = io.BytesIO()
+    try:
+        img.save(out, format="WEBP", quality=THUMB_QUALITY, method=4)
+    except (KeyError, OSError):
+        out = io.BytesIO()
+        img.convert("RGB").save(out, format="JPEG", quality=THUMB_QUALITY, optimize=True)
+    return out.getvalue(), dhash(img)
+
+# -----------------------
+# Perceptual hash (dHash)
+# -----------------------
+# 64 bits: is each pixel brighter than its right-hand neighbour on a 9x8 grayscale shrink.
+# Re-shot / re-compressed photos of the same object land within a few bits of each other.
+HASH_BITS = 64
+_UNSIGNED = (1 << HASH_BITS) - 1
+
+def dhash(img):
+    small = img.convert("L").resize((9, 8), Image.LANCZOS)
+    px = list(small.getdata())
+    value = 0
+    for row in range(8):
+        for col in range(8):
+            left = px[row * 9 + col]
+            right = px[row * 9 + col + 1]
+            value = (value << 1) | (left > right)
+    # SQLite integers are signed 64-bit
+    return value - (1 << HASH_BITS) if value >= (1 << (HASH_BITS - 1)) else value
+
+def dhash_bytes(image_bytes):
+    return dhash(Image.open(io.BytesIO(image_bytes)))
+
+def hamming(a, b):
+    return bin((a ^ b) & _UNSIGNED).count("1")
+
+def image_mime(b):
+    """Sniffs the MIME type of stored image bytes (for data: URIs)."""
+    if b[:4] == b"RIFF" and b[8:12] == b"WEBP":
+        return "image/webp"
+    if b[:8] == b"\x89PNG\r\n\x1a\n":
+        return "image/png"
+    return "image/jpeg"
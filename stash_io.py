@@ -0,0 +1,130 @@
+import json
+import os
+import tempfile
+import time
+import zipfile
+
+import stash_db
+import stash_images
+
+# -----------------------
+# 1BOX streaming export / import
+# -----------------------
+# Archive layout:
+#   boxes.jsonl   one JSON object per stash box
+#   items.jsonl   one JSON object per item ("image" points at the file below)
+#   images/<sha256>  original photos, stored once each
+# Rows are read with a cursor in chunks and images are copied file-to-zip, so peak memory
+# stays flat no matter how big the stash is.
+EXPORT_CHUNK = 200
+EXPORT_DIR = os.path.join(tempfile.gettempdir(), "1box_exports")  # owned by the app, pruned on export
+EXPORT_MAX_AGE = 30 * 60  # seconds an export stays downloadable
+
+def prune_exports(export_dir=EXPORT_DIR, max_age=EXPORT_MAX_AGE):
+    """Deletes export files older than max_age (left behind by sessions that never came back)."""
+    cutoff = time.time() - max_age
+    removed = 0
+    try:
+        entries = list(os.scandir(export_dir))
+    except FileNotFoundError:
+        return 0
+    for entry in entries:
+        try:
+            if entry.is_file() and entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+                removed += 1
+        except OSError:
+            pass  # removed by another session meanwhile
+    return removed
+
+def new_export_file(export_dir=EXPORT_DIR):
+    """A fresh file in the app's export directory (older exports are pruned first)."""
+    os.makedirs(export_dir, exist_ok=True)
+    prune_exports(export_dir)
+    return tempfile.NamedTemporaryFile(prefix="1box_export_", suffix=".zip", dir=export_dir, delete=False)
+
+def export_zip(conn, target, chunk_size=EXPORT_CHUNK):
+    """Writes the whole stash to `target` (path or binary file object). Returns the item count."""
+    count = 0
+    with zipfile.ZipFile(target, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        with zf.open("boxes.jsonl", "w") as out:
+            for box_id, name, rows, cols in stash_db.list_boxes(conn):
+                out.write((json.dumps({"id": box_id, "name": name, "rows": rows, "cols": cols}) + "\n").encode())
+
+        with zf.open("items.jsonl", "w") as out:
+            for item_id, title, remark, location, row, col, created_at, image_hash, box_id in stash_db.iter_all_items(conn, chunk_size):
+                out.write((json.dumps({
+                    "id": item_id,
+                    "title": title,
+                    "remark": remark,
+                    "location": location,
+                    "box_id": box_id,
+                    "grid_row": row,
+                    "grid_col": col,
+                    "created_at": created_at,
+                    "image": f"images/{image_hash}" if image_hash else None,
+                }, ensure_ascii=False) + "\n").encode("utf-8"))
+                count += 1
+
+        # photos are already compressed: store them as-is, one pass over distinct hashes
+        cur = conn.execute("SELECT DISTINCT image_hash FROM items WHERE image_hash IS NOT NULL")
+        while True:
+            chunk = cur.fetchmany(chunk_size)
+            if not chunk:
+                break
+            for (image_hash,) in chunk:
+                path = stash_images.original_path(image_hash)
+                if os.path.exists(path):
+                    zf.write(path, f"images/{image_hash}", compress_type=zipfile.ZIP_STORED)
+    return count
+
+def import_zip(conn, source):
+    """Loads an archive written by export_zip. Returns (imported, unplaced, skipped).
+
+    Items keep their box and slot when that cell is still free; otherwise they are imported
+    unplaced. Boxes are matched by name and created when missing. Items whose photo is
+    missing, corrupt or not an image are skipped (and counted) instead of aborting the import.
+    """
+    imported = unplaced = skipped = 0
+    with zipfile.ZipFile(source) as zf:
+        names = set(zf.namelist())
+        box_map = {}
+        existing = {name: box_id for box_id, name, _, _ in stash_db.list_boxes(conn)}
+        if "boxes.jsonl" in names:
+            with zf.open("boxes.jsonl") as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    box = json.loads(line)
+                    if box["name"] not in existing:
+                        existing[box["name"]] = stash_db.create_box(conn, box["name"], box["rows"], box["cols"])
+                    box_map[box["id"]] = existing[box["name"]]
+
+        with zf.open("items.jsonl") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                item = json.loads(line)
+                if not item.get("image") or item["image"] not in names:
+                    skipped += 1
+                    continue
+                box_id = box_map.get(item.get("box_id"), stash_db.DEFAULT_BOX)
+                try:
+                    image_bytes = zf.read(item["image"])  # one photo in memory at a time
+                except zipfile.BadZipFile:  # this member is damaged (CRC mismatch)
+                    skipped += 1
+                    continue
+                args = (conn, item.get("title"), item.get("remark"), item.get("location"), image_bytes)
+                kwargs = {"box_id": box_id, "created_at": item.get("created_at")}
+                try:
+                    try:
+                        _, row, _ = stash_db.save_item(*args, item.get("grid_row"), item.get("grid_col"), **kwargs)
+                    except stash_db.SlotOccupied:
+                        _, row, _ = stash_db.save_item(*args, **kwargs)
+                except stash_images.IMAGE_ERRORS:
+                    skipped += 1  # decoding happens before anything is written
+                    continue
+                imported += 1
+                if row is None:
+                    unplaced += 1
+    return imported, unplaced, skipped
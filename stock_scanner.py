@@ -0,0 +1,304 @@
+"""Headless stock scanner: the screening logic behind stockapp.py, runnable from cron.
+
+pandas, pandas_ta and yfinance are imported on first use, progress goes to a callback instead
+of a Streamlit widget, and results are written to the scan history for the app to pick up.
+
+    python stock_scanner.py --lists "Custom US Stocks" "TW Stocks (Top 150)"
+"""
+import time
+
+_T0 = time.perf_counter()  # for --timing: module import to first download
+
+import argparse
+import os
+import sys
+from datetime import datetime, timedelta
+
+# --- 1. Global Parameters ---
+ADX_PERIOD = 14
+RSI_PERIOD = 14
+EMA_FAST = 13
+EMA_SLOW = 26
+DATA_DAYS = 180
+RR_TARGET = 2.5      
+MIN_VOLUME = 100000  
+MIN_PRICE = 5        
+TSL_BUFFER_PERCENT = 0.02 
+SLOW_DELAY = 1.5 # Delay for ALL tickers
+TIMEOUT_SECONDS = 30 # CRITICAL FIX: Increased timeout
+
+# --- 2. Dynamic ATR Multiplier Configuration (unchanged) ---
+ATR_MULTIPLIER_CONFIG = {
+    "TSLA": 3.5, "CRWD": 3.5, "META": 3.5, "AMZN": 3.0, "NVDA": 3.5, "AMD": 3.5, "AVGO": 3.5, "MSFT": 3.0,
+    "ALAB": 3.5, "PLTR": 3.5, "ZM": 3.5, "SNOW": 3.5, "DASH": 3.5, "UBER": 3.5, "ABNB": 3.5, "ROKU": 3.5,
+    "SQ": 3.5, "SHOP": 3.5, "SNAP": 3.5, "PINS": 3.5, "NET": 3.5, "DOCU": 3.5, "FSLY": 3.5, "OKTA": 3.5,
+    "ZS": 3.5, "CRSP": 3.5,
+    "00631L.TW": 3.5, "2454.TW": 3.5, "6781.TW": 3.5, "2379.TW": 3.5, "2449.TW": 3.5, "3711.TW": 3.5, "6669.TW": 3.5, "3661.TW": 3.5,
+    "1303.TW": 3.0, "1326.TW": 3.0, "2330.TW": 3.0, "2317.TW": 3.0, "2382.TW": 3.0, "2308.TW": 3.0, "2891.TW": 3.0, "2881.TW": 3.0,
+    "DEFAULT": 3.0
+}
+
+# --- 3. Ticker List Assembly ---
+def builtin_ticker_lists():
+    sp500_tickers = ['AAPL', 'MSFT', 'GOOGL', 'AMZN', 'NVDA', 'META', 'TSLA', 'BRK-B', 'JPM', 'JNJ', 'V', 'WMT', 'PG', 'MA', 'UNH', 'HD', 'BAC', 'LLY', 'NOW', 'DHI']
+    us_stocks_custom = [
+        'AAPL', 'XLV', 'NFLX', 'ALAB', 'IJR', 'AMD', 'AMZN', 'RMBS', 'VPU', 'VIS', 'SHOP', 'SCHW', 'AVGO', 'ONDS', 
+        'QCOM', 'META', 'NVDA', 'MRVL', 'SITM', 'ISRG', 'BRK-B', 'CRWD', 'TSLA', 'ASML', 'PLTR', 'GOOGL', 'HIMS', 
+        'VRT', 'NRG', 'RTX', 'NVTS', 'CRUS', 'ENPH', 'PYPL', 'SOFI', 'MU', 'VST', 'AOSL', 'CRDO', 'TEM', 'ZS', 
+        'LLY', 'TTEK', 'MORN', 'SPXC', 'GTLS', 'PPC', 'CPAY', 'CAG', 'TAP', 'DVA', 'AA', 'BTC-USD'
+    ]
+    tw_stocks_raw = [
+        '2330', '2317', '2454', '2308', '2382', '2891', '3711', '2881', '2882', '2886', '2303', '2357', '2884', 
+        '2892', '3231', '2885', '2379', '6669', '2345', '2890', '2887', '5871', '2327', '2883', '3034', '1216', 
+        '1303', '2412', '3045', '3008', '2383', '4938', '3661', '2002', '1301', '2207', '5880', '2912', '2603', 
+        '4904', '2395', '1326', '2301', '3017', '2609', '2615', '1101', '5876', '6505', '9910', '2360', '3665', 
+        '2449', '3037', '2344', '3653', '2408', '2385', '2376', '1590', '2801', '1319', '2313', '1476', '3036', 
+        '3533', '1513', '1605', '2409', '3481', '2353', '2356', '2324', '1102', '1229', '2834', '1402', '2880', 
+        '2812', '2377', '2855', '9904', '2618', '2474', '2347', '8046', '6239', '1722', '2371', '2633', '1477', 
+        '4958', '2404', '6415', '6770', '3702', '1504', '8464', '3706', '3044', '6176', '1210', '2027', '2354', 
+        '6285', '3023', '2105', '8454', '2402', '6269', '1802', '2374', '2606', '2201', '1795', '2610', '5879', 
+        '2542', '2206', '4763', '5434', '1723', '9921', '6139', '6531', '3443', '2368', '2458', '6446', '6191', 
+        '2049', '1519', '1717', '3592', '8016', '3708', '4915', '2492', '9938', '2337', '2340', '5347', '2059', 
+        '3406', '6719', '1589', '2417', '1312'
+    ]
+    tw_tickers = [f"{t}.TW" for t in dict.fromkeys(tw_stocks_raw)]  # dedupe, keep the ranking order
+    tw_etf = ["00631L.TW"]
+    return {
+        "S&P 500 (Sample)": sp500_tickers,
+        "Custom US Stocks": us_stocks_custom,
+        "TW Stocks (Top 150)": tw_tickers,
+        "TW ETF (00631L.TW)": tw_etf
+    }
+
+def get_ticker_lists():
+    """Built-in lists plus the full S&P 500 / TWSE snapshots when they have been downloaded."""
+    import ticker_universe
+    return ticker_universe.ticker_lists(builtin_ticker_lists())
+
+# --- 4. Helper Functions (Unchanged) ---
+NAN = float("nan")
+
+def isna(value):
+    """pd.isna for scalars, without importing pandas."""
+    return value is None or value != value
+
+def calculate_tsl(data, multiplier):
+    if data.empty or len(data) < ADX_PERIOD: return NAN
+    latest_atr = data['ATR'].iloc[-1]
+    if isna(latest_atr) or latest_atr <= 0: return NAN
+    lookback_highs = data['High'].iloc[-ADX_PERIOD:].max()
+    if isna(lookback_highs): return NAN
+    tsl = lookback_highs - (latest_atr * multiplier)
+    return round(tsl, 2) if tsl > 0 else NAN
+
+def calculate_take_profit(entry_price, stop_loss, rr_ratio):
+    if isna(entry_price) or isna(stop_loss) or stop_loss <= 0: return NAN
+    risk = entry_price - stop_loss
+    if risk <= 0: return NAN
+    target = entry_price + (risk * rr_ratio)
+    return round(target, 2)
+
+def calculate_rr(entry_price, tsl_price, tp_price):
+    if isna(entry_price) or isna(tsl_price) or isna(tp_price): return NAN
+    risk = entry_price - tsl_price
+    reward = tp_price - entry_price
+    if risk <= 0 or reward <= 0: return NAN
+    return round(reward / risk, 2)
+
+def calculate_position_sizing(entry_price, tsl_price, capital=1000000, risk_percent=0.01):
+    if isna(entry_price) or isna(tsl_price) or tsl_price <= 0: return 0
+    risk_amount = capital * risk_percent
+    risk_per_share = entry_price - tsl_price
+    if risk_per_share <= 0: return 0
+    return int(risk_amount // risk_per_share)
+
+# --- Core Processing Logic (Shared) ---
+def process_ticker_data(data, ticker):
+    import pandas_ta  # noqa: F401 -- registers the DataFrame.ta accessor
+
+    multiplier = ATR_MULTIPLIER_CONFIG.get(ticker, ATR_MULTIPLIER_CONFIG["DEFAULT"])
+    data.ta.adx(length=ADX_PERIOD, append=True) 
+    data.ta.atr(length=ADX_PERIOD, append=True) 
+    data.ta.ema(length=EMA_FAST, append=True) 
+    data.ta.ema(length=EMA_SLOW, append=True) 
+    data.ta.rsi(length=RSI_PERIOD, append=True) 
+    data.dropna(inplace=True)
+    if len(data) < 2: return None, None 
+
+    latest_row = data.iloc[-1]
+    yesterday_row = data.iloc[-2]
+
+    adx = latest_row[f'ADX_{ADX_PERIOD}']
+    di_plus = latest_row[f'DMP_{ADX_PERIOD}']
+    di_minus = latest_row[f'DMN_{ADX_PERIOD}']
+    rsi = latest_row[f'RSI_{RSI_PERIOD}']
+    ema_f = latest_row[f'EMA_{EMA_FAST}']
+    ema_s = latest_row[f'EMA_{EMA_SLOW}']
+    latest_close = latest_row['Close']
+    
+    ema_f_yest = yesterday_row[f'EMA_{EMA_FAST}']
+    ema_s_yest = yesterday_row[f'EMA_{EMA_SLOW}']
+
+    avg_volume = data['Volume'].iloc[-20:].mean()
+    
+    # --- Apply Filters ---
+    if isna(adx) or isna(rsi) or isna(latest_close) or isna(avg_volume): return None, None
+    if avg_volume < MIN_VOLUME or latest_close < MIN_PRICE: return None, None
+
+    tsl_price = calculate_tsl(data, multiplier)
+    if isna(tsl_price) or tsl_price <= 0: return None, None
+    
+    stop_distance = latest_close - tsl_price
+    if stop_distance / latest_close < TSL_BUFFER_PERCENT: return None, None
+    
+    signal_data = {
+        'Ticker': ticker, 'Close': f"{latest_close:.2f}", 
+        'ADX': f"{adx:.2f}", 'RSI': f"{rsi:.2f}", 'TSL': tsl_price
+    }
+    
+    # --- TREND SIGNAL LOGIC ---
+    if adx > 25:
+        is_trend_bullish = (ema_f > ema_s) and (di_plus > di_minus) and (ema_f_yest < ema_s_yest and ema_f > ema_s) 
+        if is_trend_bullish and (rsi < 70):
+            target_price = calculate_take_profit(latest_close, tsl_price, RR_TARGET)
+            rr_ratio = calculate_rr(latest_close, tsl_price, target_price)
+            
+            if not isna(rr_ratio) and rr_ratio >= RR_TARGET:
+                return {**signal_data, 'R_R': rr_ratio, 'Target': target_price, 
+                        'DI+': f"{di_plus:.2f}", 'DI-': f"{di_minus:.2f}",
+                        'Max Shares (1% Risk)': calculate_position_sizing(latest_close, tsl_price)}, None
+
+    # --- MEAN REVERSION SIGNAL LOGIC ---
+    elif adx < 20 and rsi < 30:
+        target_price = round(ema_s, 2)
+        rr_ratio = calculate_rr(latest_close, tsl_price, target_price)
+
+        if not isna(rr_ratio) and rr_ratio > 1.0:
+            return None, {**signal_data, 'R_R': rr_ratio, 'Target (EMA_26)': target_price,
+                          'Max Shares (1% Risk)': calculate_position_sizing(latest_close, tsl_price)}
+            
+    return None, None
+
+
+# --- Single Scanning Function (Used for ALL tickers now) ---
+def print_progress(done, total, ticker):
+    """Default progress callback for the command line."""
+    print(f"[{done + 1}/{total}] {ticker}", file=sys.stderr, flush=True)
+
+def scan_all_tickers_single(ticker_list, start_date, end_date, progress=None, delay=SLOW_DELAY):
+    """Scans tickers one by one; progress(done, total, ticker) is called before each download.
+
+    Returns (trend, mean_rev, failed, no_data): `failed` is every ticker that produced nothing,
+    `no_data` the subset whose download came back empty or too short (errors are not in it).
+    """
+    import pandas as pd
+    import yfinance as yf
+
+    trend_signals = []
+    mean_rev_signals = []
+    failed_tickers = []
+    no_data_tickers = []
+    
+    for i, ticker in enumerate(ticker_list):
+        if progress:
+            progress(i, len(ticker_list), ticker)
+        
+        try:
+            # CRITICAL FIX: Add timeout parameter
+            data = yf.download(ticker, start=start_date, end=end_date, 
+                               progress=False, timeout=TIMEOUT_SECONDS)
+            
+            # --- PATCH 1: Cleanup Data ---
+            data = data.apply(pd.to_numeric, errors='coerce')
+            data.dropna(subset=['Close'], inplace=True)
+
+            if data.empty or len(data) < 40:
+                failed_tickers.append(ticker)
+                no_data_tickers.append(ticker)
+                continue
+            
+            trend_sig, mr_sig = process_ticker_data(data, ticker)
+            if trend_sig: trend_signals.append(trend_sig)
+            if mr_sig: mean_rev_signals.append(mr_sig)
+
+            time.sleep(delay) 
+
+        except Exception:
+            failed_tickers.append(ticker)
+            time.sleep(delay)
+
+    return trend_signals, mean_rev_signals, failed_tickers, no_data_tickers
+
+# --- 5. Scan Runner ---
+def run_scan(ticker_list, progress=None, delay=SLOW_DELAY, db_path=None, bulk_validate=True):
+    """Scans and stores the result in the scan history. Returns (trend, mean_rev, failed, scan_date).
+
+    Symbols that failed recently are skipped (with backoff) and the rest are bulk-validated
+    first, so dead symbols cost a share of one request instead of a download and a delay each.
+    """
+    import scan_history
+    import ticker_universe
+
+    registry = ticker_universe.connect()
+    to_scan, skipped, invalid = ticker_universe.prepare(ticker_list, registry, bulk_validate, progress)
+
+    end_date = datetime.now()
+    start_date = end_date - timedelta(days=DATA_DAYS)
+    trend, mr, scan_failed, no_data = scan_all_tickers_single(to_scan, start_date, end_date, progress, delay)
+    # Only "no data" counts towards backoff: exceptions (network, rate limits, library changes)
+    # say nothing about the symbol, and a pass where everything failed is an outage, not a purge.
+    if len(scan_failed) < len(to_scan):
+        ticker_universe.record_failures(registry, no_data)
+    ticker_universe.record_successes(registry, set(to_scan) - set(scan_failed))
+    registry.close()
+    failed = sorted(set(invalid) | set(skipped) | set(scan_failed))
+
+    conn = scan_history.connect(db_path or scan_history.DB_PATH)
+    scan_date = scan_history.record_scan(conn, trend, mr, failed, n_tickers=len(ticker_list))
+    conn.close()
+    return trend, mr, failed, scan_date
+
+def app_import_time():
+    """Seconds a fresh interpreter spends on `import stockapp` (the Streamlit app)."""
+    import subprocess
+    code = "import time; t = time.perf_counter(); import stockapp; print(time.perf_counter() - t)"
+    here = os.path.dirname(os.path.abspath(__file__))
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, cwd=here)
+    return float(out.stdout.strip()) if out.returncode == 0 else None
+
+if __name__ == "__main__":
+    ticker_groups = get_ticker_lists()
+    parser = argparse.ArgumentParser(description="Run the daily stock screen without the Streamlit UI.")
+    parser.add_argument("--lists", nargs="+", choices=list(ticker_groups), metavar="LIST", default=["Custom US Stocks", "TW Stocks (Top 150)"])
+    parser.add_argument("--tickers", nargs="+", help="scan these symbols instead of the lists")
+    parser.add_argument("--delay", type=float, default=SLOW_DELAY, help="seconds between downloads")
+    parser.add_argument("--db", help="scan history database (default: scan_history.db next to this file)")
+    parser.add_argument("--quiet", action="store_true", help="no per-ticker progress")
+    parser.add_argument("--no-validate", action="store_true", help="skip the bulk validation pass")
+    parser.add_argument("--timing", action="store_true", help="report start-up time to the first download and exit")
+    args = parser.parse_args()
+
+    tickers = args.tickers or sorted({t for key in args.lists for t in ticker_groups[key]})
+
+    if args.timing:
+        # Everything a download needs is imported by the time the first progress call happens
+        class FirstFetch(Exception):
+            pass
+        def first_fetch(done, total, ticker):
+            raise FirstFetch(time.perf_counter() - _T0)
+        try:
+            scan_all_tickers_single(tickers, datetime.now() - timedelta(days=DATA_DAYS), datetime.now(), first_fetch)
+        except FirstFetch as reached:
+            print(f"headless: {reached.args[0]:.3f}s from start to first download")
+        app = app_import_time()
+        print(f"stockapp: {app:.3f}s just to import the app" if app is not None else "stockapp: import failed")
+        sys.exit(0)
+
+    started = time.perf_counter()
+    trend, mr, failed, scan_date = run_scan(tickers, None if args.quiet else print_progress, args.delay, args.db, not args.no_validate)
+    print(f"{scan_date}: {len(tickers)} tickers in {time.perf_counter() - started:.0f}s -> "
+          f"{len(trend)} trend, {len(mr)} mean reversion, {len(failed)} failed")
+    for sig in trend:
+        print(f"  TREND {sig['Ticker']:<10} close {sig['Close']}  ADX {sig['ADX']}  R/R {sig['R_R']}")
+    for sig in mr:
+        print(f"  MR    {sig['Ticker']:<10} close {sig['Close']}  RSI {sig['RSI']}  R/R {sig['R_R']}")
@@ -0,0 +1,30 @@
+import io
+import os
+import sys
+
+import pytest
+
+# the modules live flat at the repo root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+@pytest.fixture
+def make_photo():
+    """Factory for small PNG photos of a solid colour (tests using it skip without Pillow)."""
+    image = pytest.importorskip("PIL.Image")
+
+    def make(color=(200, 30, 30), size=(64, 48)):
+        buf = io.BytesIO()
+        image.new("RGB", size, color).save(buf, format="PNG")
+        return buf.getvalue()
+    return make
+
+@pytest.fixture
+def conn(tmp_path, monkeypatch):
+    """A fresh 1BOX database (3x3 default box); originals go to tmp_path too."""
+    pytest.importorskip("PIL.Image")
+    import stash_db
+
+    monkeypatch.chdir(tmp_path)
+    conn = stash_db.init_db(str(tmp_path / "stash.db"), default_rows=3, default_cols=3)
+    yield conn
+    conn.close()
@@ -0,0 +1,87 @@
+import os
+import threading
+
+import diary_store
+
+def test_concurrent_posts_are_all_kept(tmp_path):
+    path = str(tmp_path / "log.jsonl")
+    def post(author):
+        for i in range(50):
+            diary_store.append_message(author, f"{author} {i}", path)
+    threads = [threading.Thread(target=post, args=(f"friend{n}",)) for n in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    messages, bad = diary_store.read_messages(path)
+    assert bad == 0
+    assert len(messages) == 400
+
+def test_compact_drops_corrupt_blank_and_torn_lines(tmp_path):
+    path = str(tmp_path / "log.jsonl")
+    diary_store.append_message("a", "one", path)
+    with open(path, "ab") as f:
+        f.write(b"{not json\n\n")
+    diary_store.append_message("b", "two", path)
+    with open(path, "ab") as f:
+        f.write(b'{"author": "c", "te')  # crash mid-write
+
+    assert diary_store.compact(path) == 1
+    messages, bad = diary_store.read_messages(path)
+    assert [m["text"] for m in messages] == ["one", "two"]
+    assert bad == 0
+    with open(path, "rb") as f:
+        assert f.read().endswith(b"}\n")
+
+def test_post_after_a_torn_line_is_kept(tmp_path):
+    path = str(tmp_path / "log.jsonl")
+    diary_store.append_message("a", "one", path)
+    with open(path, "ab") as f:
+        f.write(b'{"author": "c", "te')  # crash mid-write
+    diary_store.append_message("b", "two", path)
+
+    messages, bad = diary_store.read_messages(path)
+    assert [m["text"] for m in messages] == ["one", "two"]
+    assert bad == 1
+    diary_store.compact(path)
+    assert [m["text"] for m in diary_store.read_messages(path)[0]] == ["one", "two"]
+
+def test_clean_log_is_not_rewritten(tmp_path):
+    path = str(tmp_path / "log.jsonl")
+    diary_store.append_message("a", "one", path)
+    inode = os.stat(path).st_ino
+
+    assert diary_store.compact(path) == 0
+    assert os.stat(path).st_ino == inode
+
+def test_maybe_compact_runs_once_per_interval(tmp_path):
+    path = str(tmp_path / "log.jsonl")
+    diary_store.append_message("a", "one", path)
+    with open(path, "ab") as f:
+        f.write(b"\n\n")
+
+    assert diary_store.maybe_compact(path, interval=3600) == 0
+    with open(path, "rb") as f:
+        assert f.read().count(b"\n") == 1
+    with open(path, "ab") as f:
+        f.write(b"garbage\n")
+    assert diary_store.maybe_compact(path, interval=3600) is None  # not due yet
+    assert diary_store.maybe_compact(path, interval=0) == 1
+
+def test_tail_reads_only_new_lines_and_follows_compaction(tmp_path):
+    path = str(tmp_path / "log.jsonl")
+    tail = diary_store.DiaryTail(path)
+    assert tail.refresh() == 0
+
+    diary_store.append_message("a", "one", path)
+    diary_store.append_message("b", "two", path)
+    assert tail.refresh() == 2
+    assert tail.refresh() == 0
+
+    with open(path, "ab") as f:
+        f.write(b"{broken\n")
+    diary_store.append_message("c", "three", path)
+    tail.refresh()  # skips the bad line and compacts the file
+    tail.refresh()  # re-reads the replaced file
+    assert [m["text"] for m in tail.latest(10)] == ["one", "two", "three"]
@@ -0,0 +1,190 @@
+import gzip
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import news_ingest
+
+RSS = b"""<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0"><channel><title>Fixture RSS</title>
+<item><title>Rates held &amp; steady</title><link>https://example.com/rss/1</link>
+<description>&lt;p&gt;The bank kept rates &lt;b&gt;unchanged&lt;/b&gt; .&lt;/p&gt;</description>
+<pubDate>Tue, 01 Oct 2024 12:00:00 GMT</pubDate><category>Economy</category></item>
+<item><title>Second story</title><link>https://example.com/rss/2</link><description>More.</description></item>
+</channel></rss>"""
+
+ATOM = b"""<?xml version="1.0" encoding="utf-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom"><title>Fixture Atom</title>
+<entry><title>Atom headline</title><link rel="alternate" href="https://example.com/atom/1"/>
+<link rel="enclosure" href="https://example.com/atom/1.jpg"/><id>tag:example.com,2024:1</id>
+<updated>2024-10-01T08:30:00Z</updated><summary>Atom summary.</summary></entry>
+</feed>"""
+
+RDF = b"""<?xml version="1.0" encoding="UTF-8"?>
+<rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#" xmlns="http://purl.org/rss/1.0/"
+         xmlns:dc="http://purl.org/dc/elements/1.1/">
+<channel rdf:about="https://example.com/"><title>Fixture RDF</title></channel>
+<item rdf:about="https://example.com/rdf/1"><title>RDF headline</title><link>https://example.com/rdf/1</link>
+<description>RDF summary.</description><dc:date>2024-10-01T10:00:00+02:00</dc:date></item>
+</rdf:RDF>"""
+
+ETAG = '"v1"'
+LAST_MODIFIED = "Tue, 01 Oct 2024 12:00:00 GMT"
+SLOW_SECONDS = 0.5
+
+class FeedHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def send_body(self, body, **headers):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/xml")
+        for key, value in headers.items():
+            self.send_header(key.replace("_", "-"), value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self.server.requests.append((self.path, dict(self.headers)))
+        if self.path == "/rss":
+            self.send_body(RSS)
+        elif self.path == "/atom":
+            self.send_body(ATOM)
+        elif self.path == "/rdf":
+            self.send_body(RDF)
+        elif self.path == "/gzip":
+            self.send_body(gzip.compress(RSS), Content_Encoding="gzip")
+        elif self.path == "/etag":
+            if self.headers.get("If-None-Match") == ETAG:
+                self.send_response(304)
+                self.end_headers()
+            else:
+                self.send_body(RSS, ETag=ETAG)
+        elif self.path == "/last-modified":
+            if self.headers.get("If-Modified-Since") == LAST_MODIFIED:
+                self.send_response(304)
+                self.end_headers()
+            else:
+                self.send_body(RSS, Last_Modified=LAST_MODIFIED)
+        elif self.path in ("/404", "/500"):
+            self.send_error(int(self.path[1:]))
+        elif self.path == "/slow":
+            time.sleep(SLOW_SECONDS)
+            self.send_body(RSS)
+        elif self.path == "/broken":
+            self.send_body(b"<rss><channel><item><title>cut off")
+        else:
+            self.send_error(404)
+
+@pytest.fixture(scope="module")
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), FeedHandler)
+    httpd.daemon_threads = True
+    httpd.requests = []
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+def url(server, path):
+    return f"http://127.0.0.1:{server.server_address[1]}{path}"
+
+def fetch(server, path, state=None, timeout=5):
+    return news_ingest.fetch_feed(path, url(server, path), "Test", {} if state is None else state, timeout)
+
+# --- formats ---
+def test_rss_items_are_parsed_and_cleaned(server):
+    result = fetch(server, "/rss")
+    assert result["status"] == "ok"
+    first, second = result["articles"]
+    assert first["title"] == "Rates held & steady"
+    assert first["summary"] == "The bank kept rates unchanged."
+    assert first["link"] == "https://example.com/rss/1"
+    assert first["published"] == "2024-10-01T12:00:00+00:00"
+    assert first["category"] == "Economy"
+    assert first["region"] == "Test"
+    assert first["id"] == news_ingest.article_id("https://example.com/rss/1")
+    assert second["title"] == "Second story"
+
+def test_atom_uses_alternate_link(server):
+    (article,) = fetch(server, "/atom")["articles"]
+    assert article["title"] == "Atom headline"
+    assert article["link"] == "https://example.com/atom/1"
+    assert article["summary"] == "Atom summary."
+    assert article["published"] == "2024-10-01T08:30:00+00:00"
+
+def test_rdf_items_and_dc_date(server):
+    (article,) = fetch(server, "/rdf")["articles"]
+    assert article["title"] == "RDF headline"
+    assert article["link"] == "https://example.com/rdf/1"
+    assert article["published"] == "2024-10-01T08:00:00+00:00"
+
+def test_gzip_body_is_decoded(server):
+    result = fetch(server, "/gzip")
+    assert result["status"] == "ok"
+    assert [a["title"] for a in result["articles"]] == ["Rates held & steady", "Second story"]
+    path, headers = [r for r in server.requests if r[0] == "/gzip"][-1]
+    assert headers.get("Accept-Encoding") == "gzip"
+
+# --- conditional GET ---
+@pytest.mark.parametrize("path", ["/etag", "/last-modified"])
+def test_conditional_get_returns_not_modified(server, path):
+    state = {}
+    first = fetch(server, path, state)
+    assert first["status"] == "ok" and len(first["articles"]) == 2
+    assert state[path]["etag" if path == "/etag" else "last_modified"]
+
+    second = fetch(server, path, state)
+    assert second["status"] == "not_modified"
+    assert second["articles"] == []
+    assert second["error"] is None
+
+def test_no_validators_sent_without_state(server):
+    fetch(server, "/etag")
+    _, headers = [r for r in server.requests if r[0] == "/etag"][-1]
+    assert "If-None-Match" not in headers and "If-Modified-Since" not in headers
+
+# --- failures never raise ---
+@pytest.mark.parametrize("code", [404, 500])
+def test_http_errors_are_reported(server, code):
+    result = fetch(server, f"/{code}")
+    assert result["status"] == "error"
+    assert result["error"] == f"HTTP {code}"
+    assert result["articles"] == []
+
+def test_timeout_is_reported(server):
+    result = fetch(server, "/slow", timeout=0.1)
+    assert result["status"] == "error"
+    assert result["error"]
+    assert result["seconds"] < SLOW_SECONDS
+
+def test_truncated_xml_is_an_error(server):
+    result = fetch(server, "/broken")
+    assert result["status"] == "error"
+
+def test_connection_refused_is_reported():
+    result = news_ingest.fetch_feed("down", "http://127.0.0.1:9/feed", "", {}, timeout=1)
+    assert result["status"] == "error"
+
+# --- concurrent fetch ---
+def test_fetch_all_runs_feeds_concurrently(server):
+    feeds = {f"slow {i}": {"url": url(server, "/slow"), "region": "Test"} for i in range(6)}
+    feeds["atom"] = {"url": url(server, "/atom"), "region": "Test"}
+    feeds["missing"] = {"url": url(server, "/404"), "region": "Test"}
+
+    start = time.perf_counter()
+    results = news_ingest.fetch_all(feeds, state={}, timeout=5)
+    elapsed = time.perf_counter() - start
+
+    assert set(results) == set(feeds)
+    assert all(results[f"slow {i}"]["status"] == "ok" for i in range(6))
+    assert results["atom"]["articles"][0]["title"] == "Atom headline"
+    assert results["missing"]["error"] == "HTTP 404"
+    assert elapsed < SLOW_SECONDS * 3  # sequential would take 6 x SLOW_SECONDS
+
+def test_fetch_all_with_no_feeds():
+    assert news_ingest.fetch_all({}, state={}) == {}
@@ -0,0 +1,63 @@
+import os
+
+import pytest
+
+pytest.importorskip("PIL.Image")  # stash_images needs Pillow
+
+import stash_db
+import stash_images
+
+def test_place_floating_item_in_its_own_box(conn, make_photo):
+    item_id, row, col = stash_db.save_item(conn, "tape", "", "", make_photo())
+    assert (row, col) == (None, None)
+
+    placed = stash_db.place_item(conn, item_id, box_id=stash_db.DEFAULT_BOX)
+
+    assert placed == (1, 1)
+    assert stash_db.slot_owner(conn, 1, 1) == item_id
+    assert stash_db.load_floating_items(conn) == []
+
+def test_place_item_on_its_own_cell_is_a_no_op(conn, make_photo):
+    item_id, row, col = stash_db.save_item(conn, "glue", "", "", make_photo(), row=2, col=1)
+
+    assert stash_db.place_item(conn, item_id, row=2, col=1) == (2, 1)
+    assert stash_db.slot_owner(conn, 2, 1) == item_id
+
+def test_place_item_on_taken_cell_raises(conn, make_photo):
+    first, _, _ = stash_db.save_item(conn, "a", "", "", make_photo(), row=1, col=1)
+    second, _, _ = stash_db.save_item(conn, "b", "", "", make_photo((0, 0, 255)))
+
+    with pytest.raises(stash_db.SlotOccupied):
+        stash_db.place_item(conn, second, row=1, col=1)
+    assert stash_db.slot_owner(conn, 1, 1) == first
+
+def test_floating_items_are_paged_past_the_first_page(conn, make_photo):
+    photo = make_photo()
+    ids = [stash_db.save_item(conn, f"item {i}", "", "", photo)[0] for i in range(stash_db.PAGE_SIZE + 5)]
+
+    first = stash_db.load_floating_items(conn)
+    rest = stash_db.load_floating_items(conn, after_id=first[-1][0])
+
+    assert stash_db.count_floating_items(conn) == len(ids)
+    assert [r[0] for r in first + rest] == ids
+    assert len(rest) == 5
+
+def test_occupied_slot_leaves_no_orphan_file(conn, make_photo):
+    stash_db.save_item(conn, "a", "", "", make_photo(), row=1, col=1)
+    other = make_photo((10, 200, 10))
+
+    with pytest.raises(stash_db.SlotOccupied):
+        stash_db.save_item(conn, "b", "", "", other, row=1, col=1)
+
+    assert not os.path.exists(stash_images.original_path(stash_images.image_digest(other)))
+
+def test_shared_original_survives_until_last_item_is_deleted(conn, make_photo):
+    photo = make_photo()
+    first, _, _ = stash_db.save_item(conn, "a", "", "", photo)
+    second, _, _ = stash_db.save_item(conn, "b", "", "", photo)
+    path = stash_images.original_path(stash_images.image_digest(photo))
+
+    stash_db.delete_item(conn, first)
+    assert os.path.exists(path)
+    stash_db.delete_item(conn, second)
+    assert not os.path.exists(path)
@@ -0,0 +1,39 @@
+import os
+import threading
+
+import pytest
+
+pytest.importorskip("PIL.Image")
+
+import stash_images
+
+def test_same_photo_stored_from_many_threads(tmp_path):
+    image_dir = str(tmp_path / "images")
+    data = os.urandom(256 * 1024)
+    errors, digests = [], []
+    start = threading.Barrier(8)
+
+    def store():
+        start.wait()
+        try:
+            digests.append(stash_images.store_original(data, image_dir))
+        except OSError as e:
+            errors.append(e)
+
+    for _ in range(5):
+        threads = [threading.Thread(target=store) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        stash_images.remove_original(digests[-1], image_dir)
+
+    assert errors == []
+    assert len(set(digests)) == 1
+    leftovers = [f for _, _, files in os.walk(image_dir) for f in files]
+    assert leftovers == []
+
+def test_stored_original_round_trips(tmp_path):
+    image_dir = str(tmp_path / "images")
+    digest = stash_images.store_original(b"photo bytes", image_dir)
+    assert stash_images.load_original(digest, image_dir) == b"photo bytes"
@@ -0,0 +1,64 @@
+import io
+import json
+import os
+import zipfile
+
+import pytest
+
+pytest.importorskip("PIL.Image")  # stash_images needs Pillow
+
+import stash_db
+import stash_io
+
+def archive(items, images):
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w") as zf:
+        zf.writestr("items.jsonl", "".join(json.dumps(item) + "\n" for item in items))
+        for name, data in images.items():
+            zf.writestr(name, data)
+    buf.seek(0)
+    return buf
+
+def test_export_import_round_trip(conn, tmp_path, make_photo):
+    stash_db.save_item(conn, "tape", "blue", "drawer", make_photo((0, 0, 255)), row=1, col=2)
+    stash_db.save_item(conn, "glue", "", "", make_photo((0, 255, 0)))
+    target = tmp_path / "export.zip"
+    assert stash_io.export_zip(conn, str(target)) == 2
+
+    other = stash_db.init_db(str(tmp_path / "other.db"))
+    assert stash_io.import_zip(other, str(target)) == (2, 1, 0)
+    assert stash_db.count_items(other) == 2
+    other.close()
+
+def test_unreadable_photos_are_skipped_not_fatal(conn, make_photo):
+    items = [
+        {"title": "good", "image": "images/good", "grid_row": 1, "grid_col": 1},
+        {"title": "not an image", "image": "images/text"},
+        {"title": "truncated", "image": "images/truncated"},
+        {"title": "missing", "image": "images/nowhere"},
+        {"title": "also good", "image": "images/good2"},
+    ]
+    images = {
+        "images/good": make_photo((255, 0, 0)),
+        "images/text": b"definitely not a photo",
+        "images/truncated": make_photo((9, 9, 9))[:40],
+        "images/good2": make_photo((0, 0, 0)),
+    }
+
+    imported, unplaced, skipped = stash_io.import_zip(conn, archive(items, images))
+
+    assert (imported, unplaced, skipped) == (2, 1, 3)
+    titles = {row[1] for row in stash_db.load_items_page(conn)}
+    assert titles == {"good", "also good"}
+
+def test_stale_exports_are_pruned(tmp_path):
+    export_dir = str(tmp_path / "exports")
+    with stash_io.new_export_file(export_dir) as old:
+        old.write(b"old")
+    os.utime(old.name, (0, 0))
+
+    with stash_io.new_export_file(export_dir) as fresh:
+        fresh.write(b"new")
+
+    assert not os.path.exists(old.name)
+    assert os.path.exists(fresh.name)
@@ -0,0 +1,217 @@
+"""Ticker universes for the stock scanner: constituent lists from local CSV snapshots, a registry
+of symbols that failed before (skipped with exponential backoff), and bulk validation.
+
+    python ticker_universe.py --update sp500 twse     # refresh the CSV snapshots
+    python ticker_universe.py --validate "S&P 500 (Full)"  # check a whole list in a few requests
+    python ticker_universe.py --failed                 # symbols currently being skipped
+"""
+import argparse
+import csv
+import json
+import os
+import sqlite3
+import urllib.request
+from datetime import datetime, timedelta
+
+# --- CONFIGURATION ---
+# next to this file, so cron jobs (any working directory) and the app share the same snapshots
+UNIVERSE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "universes")
+REGISTRY_PATH = os.path.join(UNIVERSE_DIR, "failed_symbols.db")
+BACKOFF_BASE_DAYS = 1    # first failure: skip for a day, then 2, 4, 8, ...
+BACKOFF_MAX_DAYS = 90
+VALIDATE_CHUNK = 200     # symbols per bulk yf.download
+VALIDATE_PERIOD = "5d"
+TIMEOUT = 30
+
+SP500_URL = "https://en.wikipedia.org/wiki/List_of_S%26P_500_companies"
+TWSE_URL = "https://openapi.twse.com.tw/v1/exchangeReport/STOCK_DAY_ALL"
+
+# list name -> snapshot file; these lists only appear once their snapshot has been downloaded
+SNAPSHOTS = {
+    "S&P 500 (Full)": "sp500.csv",
+    "TWSE (All Listed)": "twse.csv",
+}
+
+# --- SNAPSHOTS ---
+def normalize_symbol(symbol, market="US"):
+    """Exchange codes to Yahoo symbols: BRK.B -> BRK-B, 2330 -> 2330.TW."""
+    symbol = symbol.strip().upper()
+    if market == "TW":
+        return symbol if symbol.endswith((".TW", ".TWO")) else f"{symbol}.TW"
+    return symbol.replace(".", "-")
+
+def snapshot_path(filename):
+    return os.path.join(UNIVERSE_DIR, filename)
+
+def read_snapshot(filename):
+    """Symbols from a snapshot CSV (a "Symbol" column), in file order, or None if there is no file."""
+    path = snapshot_path(filename)
+    if not os.path.exists(path):
+        return None
+    with open(path, newline="", encoding="utf-8") as f:
+        symbols = [row["Symbol"].strip() for row in csv.DictReader(f) if (row.get("Symbol") or "").strip()]
+    return list(dict.fromkeys(symbols)) or None
+
+def write_snapshot(filename, rows):
+    """Writes (symbol, name) rows atomically so a half-finished download never replaces a good file."""
+    os.makedirs(UNIVERSE_DIR, exist_ok=True)
+    path = snapshot_path(filename)
+    tmp = path + ".tmp"
+    with open(tmp, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Symbol", "Name"])
+        writer.writerows(rows)
+    os.replace(tmp, path)
+    return len(rows)
+
+def download_sp500():
+    """Current S&P 500 constituents from Wikipedia (needs pandas + lxml)."""
+    import pandas as pd
+    table = pd.read_html(SP500_URL, attrs={"id": "constituents"})[0]
+    rows = [(normalize_symbol(s), name) for s, name in zip(table["Symbol"], table["Security"])]
+    return write_snapshot("sp500.csv", rows)
+
+def download_twse():
+    """Every listed TWSE common stock and ETF from the exchange's open API."""
+    req = urllib.request.Request(TWSE_URL, headers={"User-Agent": "Mozilla/5.0", "Accept": "application/json"})
+    with urllib.request.urlopen(req, timeout=TIMEOUT) as resp:
+        listing = json.load(resp)
+    # 4-digit codes are common stocks; 00xxx codes are ETFs. Warrants and others are longer.
+    rows = [
+        (normalize_symbol(item["Code"], "TW"), item.get("Name", ""))
+        for item in listing
+        if len(item["Code"]) == 4 or item["Code"].startswith("00")
+    ]
+    return write_snapshot("twse.csv", rows)
+
+DOWNLOADERS = {"sp500": download_sp500, "twse": download_twse}
+
+def ticker_lists(builtin):
+    """The built-in lists plus every snapshot list that exists on disk. Without snapshots the
+    scanner simply keeps working from the built-in lists."""
+    lists = dict(builtin)
+    for name, filename in SNAPSHOTS.items():
+        symbols = read_snapshot(filename)
+        if symbols:
+            lists[name] = symbols
+    return lists
+
+# --- FAILED-SYMBOL REGISTRY ---
+def connect(path=REGISTRY_PATH):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS failures (
+            symbol TEXT PRIMARY KEY,
+            failures INTEGER NOT NULL,
+            last_failed TEXT NOT NULL,
+            retry_after TEXT NOT NULL
+        ) WITHOUT ROWID""")
+    return conn
+
+def backoff(failures):
+    return timedelta(days=min(BACKOFF_BASE_DAYS * 2 ** (failures - 1), BACKOFF_MAX_DAYS))
+
+def record_failures(conn, symbols, now=None):
+    """Each call counts one more failure and doubles the time the symbol is skipped."""
+    now = now or datetime.now()
+    known = dict(conn.execute("SELECT symbol, failures FROM failures"))
+    rows = []
+    for symbol in set(symbols):
+        count = known.get(symbol, 0) + 1
+        rows.append((symbol, count, now.isoformat(timespec="seconds"), (now + backoff(count)).isoformat(timespec="seconds")))
+    with conn:
+        conn.executemany("INSERT OR REPLACE INTO failures VALUES (?, ?, ?, ?)", rows)
+
+def record_successes(conn, symbols):
+    """A symbol that returns data again starts with a clean slate."""
+    with conn:
+        conn.executemany("DELETE FROM failures WHERE symbol = ?", [(s,) for s in set(symbols)])
+
+def backed_off(conn, now=None):
+    """Symbols still inside their backoff window."""
+    now = (now or datetime.now()).isoformat(timespec="seconds")
+    return {r[0] for r in conn.execute("SELECT symbol FROM failures WHERE retry_after > ?", (now,))}
+
+def split_due(conn, symbols, now=None):
+    """(symbols to scan, symbols skipped because they failed recently), order preserved."""
+    skip = backed_off(conn, now)
+    return [s for s in symbols if s not in skip], [s for s in symbols if s in skip]
+
+# --- BULK VALIDATION ---
+def _chunk_closes(data, chunk):
+    """{symbol: has any close} from one multi-symbol download (handles both column layouts)."""
+    close = data["Close"]
+    if getattr(close, "ndim", 1) == 1:  # single symbol, flat columns
+        return {chunk[0]: bool(close.notna().any())}
+    return {symbol: bool(close[symbol].notna().any()) for symbol in close.columns}
+
+def validate(symbols, conn=None, chunk_size=VALIDATE_CHUNK, progress=None):
+    """Checks many symbols with a few multi-symbol downloads of the last few days.
+
+    Returns (valid, invalid). Symbols whose chunk could not be fetched at all (network trouble)
+    count as valid, so an outage doesn't push the whole universe into backoff. With a registry
+    connection, invalid symbols are recorded as failures and valid ones are cleared.
+    """
+    import yfinance as yf
+
+    valid, invalid, unknown = [], [], []
+    for start in range(0, len(symbols), chunk_size):
+        chunk = symbols[start:start + chunk_size]
+        if progress:
+            progress(start, len(symbols), chunk[0])
+        try:
+            data = yf.download(chunk, period=VALIDATE_PERIOD, progress=False, threads=True, timeout=TIMEOUT)
+            alive = _chunk_closes(data, chunk) if not data.empty else {}
+        except Exception:
+            unknown.extend(chunk)
+            continue
+        if not alive:
+            unknown.extend(chunk)  # nothing came back for anyone: treat like a failed request
+            continue
+        for symbol in chunk:
+            (valid if alive.get(symbol) else invalid).append(symbol)
+
+    if conn is not None:
+        record_failures(conn, invalid)
+        record_successes(conn, valid)
+    return valid + unknown, invalid
+
+def prepare(symbols, conn=None, bulk_validate=True, progress=None):
+    """Symbols worth a full download: drops those in backoff, then bulk-validates the rest.
+
+    Returns (to_scan, skipped, invalid).
+    """
+    own = conn is None
+    conn = conn or connect()
+    to_scan, skipped = split_due(conn, symbols)
+    invalid = []
+    if bulk_validate and to_scan:
+        to_scan, invalid = validate(to_scan, conn, progress=progress)
+    if own:
+        conn.close()
+    return to_scan, skipped, invalid
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manage the stock scanner's ticker universes.")
+    parser.add_argument("--update", nargs="+", choices=list(DOWNLOADERS), help="download fresh snapshots")
+    parser.add_argument("--validate", metavar="LIST", help="bulk-validate one of the scanner's lists")
+    parser.add_argument("--failed", action="store_true", help="show the failed-symbol registry")
+    args = parser.parse_args()
+
+    for name in args.update or []:
+        print(f"{name}: {DOWNLOADERS[name]()} symbols -> {UNIVERSE_DIR}/")
+
+    if args.validate:
+        from stock_scanner import get_ticker_lists
+        symbols = get_ticker_lists()[args.validate]
+        conn = connect()
+        to_scan, skipped, invalid = prepare(symbols, conn)
+        print(f"{args.validate}: {len(to_scan)} valid, {len(invalid)} invalid, {len(skipped)} in backoff")
+        for symbol in invalid:
+            print(f"  invalid: {symbol}")
+
+    if args.failed:
+        conn = connect()
+        for row in conn.execute("SELECT symbol, failures, last_failed, retry_after FROM failures ORDER BY retry_after DESC"):
+            print("{:<12} {:>3} failures, last {}, retry after {}".format(*row))
@@ -1,7 +1,10 @@
 import streamlit as st
-import time
-import random
-from datetime import datetime
+
+import news_cluster
+import news_ingest
+import news_render
+import news_store
+import news_summarize
 
 # 1. Page Configuration
 st.set_page_config(
@@ -85,12 +88,63 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# 3. Data Simulation (This is where you would normally fetch RSS feeds)
-# In a real app, you would replace this function with `requests.get()` calls.
-def fetch_news_data():
-    """Simulates fetching fresh data from an API."""
-    
-    # Static data to start with (Real headlines from Nov 23, 2025)
+# 3. Data - live RSS/Atom feeds (news_ingest.py), with the sample briefing as an offline fallback
+CATEGORY_CLASSES = {
+    "conflict": "badge-conflict",
+    "environment": "badge-env",
+    "climate": "badge-env",
+    "culture": "badge-culture",
+    "arts": "badge-culture",
+}
+
+def to_card(story, summarizer):
+    """One story (same event from one or more outlets, freshest first) -> the card renderer's dict."""
+    lead = story[0]
+    category = next((a["category"] for a in story if a["category"]), None) or lead["region"] or "World"
+    outlets = list(dict.fromkeys(a["source"] for a in story))
+    regions = list(dict.fromkeys(a["region"] for a in story if a["region"]))
+    return {
+        "id": lead["id"],
+        "version": news_summarize.story_key(story),
+        "link": lead["link"],
+        "headline": lead["title"],
+        "summary": summarizer.summarize(story),
+        "source": " / ".join(outlets),
+        "region": " / ".join(regions),
+        "category": category,
+        "cat_class": CATEGORY_CLASSES.get(category.lower(), "badge-tech"),
+        "time": news_ingest.time_ago(lead["published"]),
+        "published": lead["published"],
+    }
+
+@st.cache_resource
+def get_news_service():
+    """One article store + one feed scheduler per process, shared by every session."""
+    store = news_store.NewsStore(news_store.DB_PATH)
+    scheduler = news_store.FeedScheduler(store).start()
+    return store, scheduler
+
+@st.cache_resource
+def get_story_clusterer():
+    """Incremental MinHash-LSH clusterer shared by all sessions (only new articles are hashed)."""
+    return news_cluster.StoryClusterer()
+
+@st.cache_resource
+def get_summarizer():
+    """Local extractive summarizer; IDF stats grow with the feed, summaries are cached by content."""
+    return news_summarize.Summarizer()
+
+def fetch_stories():
+    """Latest snapshot of the shared store, grouped into cross-outlet stories (newest first)."""
+    store, _ = get_news_service()
+    articles = store.snapshot()
+    clusterer = get_story_clusterer()
+    clusterer.retain(a["id"] for a in articles)
+    get_summarizer().observe(articles)  # IDF over the whole collection, not just the visible page
+    return clusterer.clusters(articles)
+
+def sample_articles():
+    """Static briefing shown when no feed could be reached (Real headlines from Nov 23, 2025)."""
     base_articles = [
         {
             "headline": "Israeli Airstrikes Renewed in Gaza Amidst Fragile Ceasefire",
@@ -129,27 +183,12 @@ def fetch_news_data():
             "time": "8 hrs ago"
         }
     ]
-    
-    # Simulate a random "Breaking News" update if we refresh
-    if "last_fetch" in st.session_state:
-        if random.random() > 0.5:
-            base_articles.insert(0, {
-                "headline": "BREAKING: G20 Leaders Issue Joint Statement on AI Safety",
-                "summary": "In a surprise late-night announcement, G20 leaders have agreed to a new binding framework for Artificial Intelligence safety protocols. Markets in Asia have reacted positively.",
-                "source": "Breaking Wire",
-                "region": "Global",
-                "category": "Technology",
-                "cat_class": "badge-tech",
-                "time": "Just now"
-            })
-    
     return base_articles
 
-# 4. Session State Management
-if 'news_data' not in st.session_state:
-    st.session_state.news_data = fetch_news_data()
-if 'last_fetch' not in st.session_state:
-    st.session_state.last_fetch = datetime.now().strftime("%H:%M")
+# 4. Shared store - sessions read the snapshot, the background scheduler does the fetching
+news_store_handle, news_scheduler = get_news_service()
+stories = fetch_stories()
+last_fetch = news_scheduler.last_refresh.strftime("%H:%M") if news_scheduler.last_refresh else "fetching…"
 
 # 5. Sidebar - Sources
 with st.sidebar:
@@ -159,20 +198,20 @@ with st.sidebar:
     
     st.subheader("Active Sources")
     
-    sources = {
-        "Americas": ["NY Times (USA)", "ABC News (USA)", "TIME (USA)"],
-        "Asia": ["Straits Times (SG)", "NHK (Japan)", "PTS (Taiwan)"],
-        "Europe": ["The Guardian (UK)", "DW News (DE)"]
-    }
+    sources = {}
+    for outlet, feed in news_ingest.FEEDS.items():
+        sources.setdefault(feed["region"], []).append(outlet)
+    feed_status = news_scheduler.feed_status()
     
     for region, outlets in sources.items():
         st.markdown(f"**{region}**")
         for outlet in outlets:
-            st.markdown(f"🟢 <span style='color:#cbd5e1; font-size:0.9em'>{outlet}</span>", unsafe_allow_html=True)
+            dot = "🔴" if feed_status.get(outlet) == "error" else "🟢"
+            st.markdown(f"{dot} <span style='color:#cbd5e1; font-size:0.9em'>{outlet}</span>", unsafe_allow_html=True)
         st.write("") # Spacer
 
     st.markdown("---")
-    st.info("ℹ️ **AI Aggregation:** Summaries are generated using cross-verified data points from the listed sources.")
+    st.info("ℹ️ **Aggregation:** Stories are matched across the listed sources and summarized from all of their reports.")
 
 # 6. Main Content Area
 col1, col2 = st.columns([3, 1])
@@ -188,37 +227,41 @@ with col2:
     st.write("") # Alignment spacer
     st.write("") 
     if st.button("🔄 Update Briefing"):
-        with st.spinner('Fetching latest headlines...'):
-            time.sleep(1.5) # Simulate network delay
-            st.session_state.news_data = fetch_news_data()
-            st.session_state.last_fetch = datetime.now().strftime("%H:%M")
-            st.rerun()
-    st.markdown(f"<div style='text-align: right; color: #64748b; font-size: 0.8em;'>Last updated: {st.session_state.last_fetch}</div>", unsafe_allow_html=True)
+        # instant: re-read the shared snapshot and nudge the scheduler if its data is stale
+        news_scheduler.refresh_now()
+        st.rerun()
+    st.markdown(f"<div style='text-align: right; color: #64748b; font-size: 0.8em;'>Last updated: {last_fetch}</div>", unsafe_allow_html=True)
 
 st.markdown("---")
 
-# 7. Rendering the Articles
+# 7. Rendering the Articles - one page of cards per rerun, sent as a single HTML block
 st.subheader("Top Headlines")
 
-for article in st.session_state.news_data:
-    # Using HTML/Markdown for the card design to get the specific look
-    st.markdown(f"""
-    <div class="news-card">
-        <div style="display: flex; justify-content: space-between; align-items: center; margin-bottom: 10px;">
-            <div>
-                <span class="badge {article['cat_class']}">{article['category'].upper()}</span>
-                <span class="timestamp">🕒 {article['time']}</span>
-            </div>
-            <span class="region-tag">{article['region']}</span>
-        </div>
-        <h3 style="margin-top: 0; margin-bottom: 10px; font-size: 1.3em;">{article['headline']}</h3>
-        <p style="color: #cbd5e1; line-height: 1.6;">{article['summary']}</p>
-        <div style="border-top: 1px solid #334155; margin-top: 15px; padding-top: 10px; display: flex; justify-content: space-between;">
-            <span class="source-tag">Sources: {article['source']}</span>
-            <a href="#" style="color: #60a5fa; text-decoration: none; font-size: 0.9em;">Read Analysis →</a>
-        </div>
-    </div>
-    """, unsafe_allow_html=True)
+if "news_page" not in st.session_state:
+    st.session_state.news_page = 0
+total_pages = news_render.page_count(len(stories))
+st.session_state.news_page = news_render.clamp_page(st.session_state.news_page, len(stories))
+
+if stories:
+    # only the visible stories are turned into cards (and summarized on first sight)
+    summarizer = get_summarizer()
+    news_data = [to_card(story, summarizer) for story in news_render.page_slice(stories, st.session_state.news_page)]
+else:
+    news_data = sample_articles()
+st.markdown(news_render.render_cards(news_data), unsafe_allow_html=True)
+
+if total_pages > 1:
+    nav_prev, nav_info, nav_next = st.columns([1, 2, 1])
+    with nav_prev:
+        if st.session_state.news_page > 0 and st.button("← Newer"):
+            st.session_state.news_page -= 1
+            st.rerun()
+    with nav_info:
+        st.markdown(f"<div style='text-align: center; color: #64748b;'>Page {st.session_state.news_page + 1} of {total_pages} · {len(stories)} stories</div>", unsafe_allow_html=True)
+    with nav_next:
+        if st.session_state.news_page < total_pages - 1 and st.button("Older →"):
+            st.session_state.news_page += 1
+            st.rerun()
 
 st.markdown("""
 <div style="text-align: center; color: #475569; margin-top: 40px; text-transform: uppercase; letter-spacing: 2px; font-size: 0.8em;">